@@ -1,4 +1,5 @@
 import os
+import re
 
 from config import Config
 from Music.core.logger import LOGS
@@ -30,6 +31,9 @@ if Config.LOGGER_ID == 0:
 if not Config.OWNER_ID:
     LOGS.error("\x4f\x57\x4e\x45\x52\x20\x49\x44\x20\x69\x73\x20\x6d\x69\x73\x73\x69\x6e\x67\x21\x20\x4b\x69\x6e\x64\x6c\x79\x20\x63\x68\x65\x63\x6b\x20\x61\x67\x61\x69\x6e\x21")
     quit(1)
-if not Config.HELLBOT_SESSION:
-    LOGS.error("\x48\x45\x4c\x4c\x42\x4f\x54\x20\x53\x45\x53\x53\x49\x4f\x4e\x20\x69\x73\x20\x6d\x69\x73\x73\x69\x6e\x67\x21\x20\x4b\x69\x6e\x64\x6c\x79\x20\x63\x68\x65\x63\x6b\x20\x61\x67\x61\x69\x6e\x21")
-    quit(1)
+# assistants can also be added at runtime and stored in database, so a
+# missing local session is not fatal; start() exits if the pool ends up empty
+if not any(
+    re.fullmatch(r"HELLBOT_SESSION\d*", key) and value for key, value in os.environ.items()
+) and not (os.path.isdir(Config.SESSIONS_DIR) and os.listdir(Config.SESSIONS_DIR)):
+    LOGS.warning(">> No local assistant sessions, looking for them in database.")
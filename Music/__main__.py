@@ -1,6 +1,7 @@
 from pyrogram import idle
 
 from config import Config
+from Music.core.boot import boot
 from Music.core.calls import hellmusic
 from Music.core.clients import hellbot
 from Music.core.database import db
@@ -20,10 +21,14 @@ async def start_bot():
         "\x41\x6c\x6c\x20\x43\x68\x65\x63\x6b\x73\x20\x43\x6f\x6d\x70\x6c\x65\x74\x65\x64\x21\x20\x4c\x65\x74\x27\x73\x20\x53\x74\x61\x72\x74\x20\x48\x65\x6c\x6c\x2d\x4d\x75\x73\x69\x63\x2e\x2e\x2e"
     )
 
-    await user_data.setup()
-    await hellbot.start()
-    await hellmusic.start()
-    await db.connect()
+    # the bot only starts taking updates once banned and sudo users are loaded
+    boot.step("database", db.connect)
+    boot.step("users", user_data.setup, after=("database",))
+    boot.step("bot", hellbot.start_bot, after=("users",))
+    boot.step("peers", db.load_peers, after=("database",))
+    boot.step("assistants", hellbot.start_assistants, after=("database",))
+    boot.step("calls", hellmusic.start, after=("assistants",))
+    await boot.run()
 
     try:
         if Config.BOT_PIC:
@@ -61,6 +66,7 @@ async def start_bot():
     )
 
     await idle()
+    await db.flush_counters()
 
     await hellbot.app.send_message(
         Config.LOGGER_ID,
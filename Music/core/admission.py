@@ -0,0 +1,166 @@
+import asyncio
+import time
+
+import psutil
+
+from config import Config
+
+from .cpu import CPUSampler
+from .database import db
+
+
+class AdmissionControl:
+    """
+    Decides whether a new voice chat session fits on this host.
+    - per stream cost (cpu, memory, upload) is measured from the running ffmpeg
+      processes and network counters, a video stream counts as ASSISTANT_VIDEO_WEIGHT
+    - a new session is admitted, downgraded to audio only or refused
+    - an admitted session holds a reserved slot until it joins or gives up, so
+      a burst of plays can't all pass the check while they download
+    """
+
+    def __init__(self):
+        self.procs = {}  # pid -> psutil.Process, kept for cpu_percent deltas
+        self.cpu = CPUSampler()
+        self.cost = {"cpu": 0.0, "ram": 0.0, "net": 0.0}  # per stream unit
+        self.host = {"cpu": 0.0, "ram": 0.0, "net": 0.0}
+        self.pending = {}  # reservation -> (chat_id, vc_type) admitted but not joined yet
+        self.refused = 0
+        self.downgraded = 0
+        self._net = None  # (time, bytes sent)
+
+    def _waiting(self) -> tuple:
+        """(voice, video) reservations whose session has not started yet."""
+        voice = video = 0
+        for chat_id, vc_type in self.pending.values():
+            # already joined, the session counts itself
+            if chat_id in db.sessions:
+                continue
+            if vc_type == "video":
+                video += 1
+            else:
+                voice += 1
+        return voice, video
+
+    def _streams(self) -> tuple:
+        video = db.sessions.count("video")
+        waiting = self._waiting()
+        return db.sessions.count() - video + waiting[0], video + waiting[1]
+
+    def reserve(self, chat_id: int, vc_type: str) -> object:
+        """Hold a slot for an admitted session, call right after admit() returns."""
+        reservation = object()
+        self.pending[reservation] = (chat_id, vc_type)
+        return reservation
+
+    def release(self, reservation: object):
+        if reservation is not None:
+            self.pending.pop(reservation, None)
+
+    def measure(self):
+        cpu = ram = 0.0
+        alive = {}
+        for child in psutil.Process().children(recursive=True):
+            proc = self.procs.get(child.pid, child)
+            try:
+                if "ffmpeg" not in proc.name():
+                    continue
+                cpu += proc.cpu_percent(interval=None)
+                ram += proc.memory_info().rss / 1024 / 1024
+            except psutil.Error:
+                continue
+            alive[proc.pid] = proc
+        self.procs = alive
+
+        now, sent = time.time(), psutil.net_io_counters().bytes_sent
+        net = 0.0
+        if self._net:
+            net = (sent - self._net[1]) * 8 / 1024 / 1024 / max(now - self._net[0], 1)
+        self._net = (now, sent)
+
+        self.host = {
+            "cpu": self.cpu.percent(),
+            "ram": psutil.virtual_memory().percent,
+            "net": net,
+        }
+        # only running sessions show up in the measured processes
+        video = db.sessions.count("video")
+        units = db.sessions.count() - video + video * Config.ASSISTANT_VIDEO_WEIGHT
+        if units:
+            self.cost = {
+                "cpu": cpu / (psutil.cpu_count() or 1) / units,
+                "ram": ram / units,
+                "net": net / units,
+            }
+
+    def _fits(self, units: int) -> bool:
+        # reserved sessions are not in the measured host load yet
+        voice, video = self._waiting()
+        units += voice + video * Config.ASSISTANT_VIDEO_WEIGHT
+        total_ram = psutil.virtual_memory().total / 1024 / 1024
+        if Config.ADMISSION_CPU and self.host["cpu"] + self.cost["cpu"] * units > Config.ADMISSION_CPU:
+            return False
+        if (
+            Config.ADMISSION_RAM
+            and self.host["ram"] + self.cost["ram"] * units / total_ram * 100 > Config.ADMISSION_RAM
+        ):
+            return False
+        if Config.MAX_BANDWIDTH and self.host["net"] + self.cost["net"] * units > Config.MAX_BANDWIDTH:
+            return False
+        return True
+
+    def check(self, vc_type: str):
+        """vc_type the session can start with, or None if there is no room."""
+        voice, video = self._streams()
+        if Config.MAX_STREAMS and voice + video >= Config.MAX_STREAMS:
+            return None
+        if vc_type == "video":
+            if (
+                not (Config.MAX_VIDEO_STREAMS and video >= Config.MAX_VIDEO_STREAMS)
+                and self._fits(Config.ASSISTANT_VIDEO_WEIGHT)
+            ):
+                return "video"
+            return "voice" if self._fits(1) else None
+        return "voice" if self._fits(1) else None
+
+    async def admit(self, vc_type: str, on_wait=None):
+        """Wait up to ADMISSION_WAIT seconds for room; returns the admitted vc_type or None."""
+        deadline = time.time() + Config.ADMISSION_WAIT
+        waited = False
+        while True:
+            admitted = self.check(vc_type)
+            if admitted or time.time() >= deadline:
+                break
+            if not waited and on_wait:
+                await on_wait()
+            waited = True
+            await asyncio.sleep(5)
+            self.measure()
+        if admitted is None:
+            self.refused += 1
+        elif admitted != vc_type:
+            self.downgraded += 1
+        return admitted
+
+    def stats(self) -> dict:
+        voice, video = self._streams()
+        return {
+            "voice": voice,
+            "video": video,
+            "max_streams": Config.MAX_STREAMS or "∞",
+            "max_video": Config.MAX_VIDEO_STREAMS or "∞",
+            "host_cpu": round(self.host["cpu"], 1),
+            "host_ram": round(self.host["ram"], 1),
+            "host_net": round(self.host["net"], 2),
+            "max_cpu": f"{Config.ADMISSION_CPU}%" if Config.ADMISSION_CPU else "∞",
+            "max_ram": f"{Config.ADMISSION_RAM}%" if Config.ADMISSION_RAM else "∞",
+            "max_net": Config.MAX_BANDWIDTH or "∞",
+            "cpu": round(self.cost["cpu"], 1),
+            "ram": round(self.cost["ram"], 1),
+            "net": round(self.cost["net"], 2),
+            "refused": self.refused,
+            "downgraded": self.downgraded,
+        }
+
+
+admission = AdmissionControl()
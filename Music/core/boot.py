@@ -0,0 +1,62 @@
+import asyncio
+import time
+
+from .logger import LOGS
+
+
+class BootOrchestrator:
+    """
+    Runs boot steps concurrently, each one as soon as the steps it depends on are done.
+    Slow work that nothing waits for (channel joins etc.) is spawned in background.
+    """
+
+    def __init__(self):
+        self.steps = {}  # name -> (func, after)
+        self.timings = {}  # name -> seconds taken
+        self.background = set()
+
+    def step(self, name: str, func, after: tuple = ()):
+        self.steps[name] = (func, tuple(after))
+
+    async def _run_step(self, name: str, tasks: dict):
+        func, after = self.steps[name]
+        if after:
+            await asyncio.gather(*(tasks[x] for x in after))
+        start = time.perf_counter()
+        await func()
+        self.timings[name] = time.perf_counter() - start
+        LOGS.info(f">> Boot step '{name}' done in {self.timings[name]:.2f}s")
+
+    async def run(self):
+        for name, (_, after) in self.steps.items():
+            missing = [x for x in after if x not in self.steps]
+            if missing:
+                raise ValueError(f"Boot step '{name}' depends on unknown step(s): {missing}")
+
+        start = time.perf_counter()
+        tasks = {}
+        for name in self.steps:
+            tasks[name] = asyncio.ensure_future(self._run_step(name, tasks))
+        try:
+            await asyncio.gather(*tasks.values())
+        except BaseException:
+            for task in tasks.values():
+                task.cancel()
+            raise
+        self.timings["total"] = time.perf_counter() - start
+        LOGS.info(f">> Boot completed in {self.timings['total']:.2f}s")
+
+    def spawn(self, coro, name: str = "background"):
+        task = asyncio.ensure_future(coro)
+        self.background.add(task)
+
+        def _done(t: asyncio.Task):
+            self.background.discard(t)
+            if not t.cancelled() and t.exception():
+                LOGS.warning(f">> Background boot job '{name}' failed: {t.exception()}")
+
+        task.add_done_callback(_done)
+        return task
+
+
+boot = BootOrchestrator()
@@ -1,10 +1,16 @@
-import datetime
+import asyncio
 import os
+import time
+from collections import deque
 
 from pyrogram.enums import ChatMemberStatus
 from pyrogram.errors import (
+    AuthKeyUnregistered,
     ChatAdminRequired,
+    SessionRevoked,
     UserAlreadyParticipant,
+    UserDeactivated,
+    UserDeactivatedBan,
     UserNotParticipant,
     FloodWait,
 )
@@ -12,24 +18,31 @@ from pyrogram.types import InlineKeyboardMarkup
 from pytgcalls import PyTgCalls, StreamType
 from pytgcalls.exceptions import AlreadyJoinedError, NoActiveGroupCall
 from pytgcalls.types.input_stream import AudioPiped, AudioVideoPiped
-from pytgcalls.types.input_stream.quality import MediumQualityAudio, MediumQualityVideo
 
 from config import Config
 from Music.helpers.buttons import Buttons
+from Music.helpers.formatters import formatter
 from Music.helpers.strings import TEXTS
 from Music.utils.exceptions import (
+    AssistantException,
     ChangeVCException,
     JoinGCException,
     JoinVCException,
     UserException,
 )
 from Music.utils.queue import Queue
+from Music.utils.seek import seeker
+from Music.utils.transcode import transcoder
 from Music.utils.thumbnail import thumb
 from Music.utils.youtube import ytube
 
 from .clients import hellbot
 from .database import db
 from .logger import LOGS
+from .mailbox import mailbox
+from .quality import QualityController
+from .scheduler import AssistantScheduler
+from .timers import timers
 
 
 async def __clean__(chat_id: int, force: bool):
@@ -46,41 +59,352 @@ async def __clean__(chat_id: int, force: bool):
 
 class HellMusic(PyTgCalls):
     def __init__(self):
-        # all assistant accounts from updated clients.py
-        self.assistants = getattr(hellbot, "users", None) or (
-            [hellbot.user] if getattr(hellbot, "user", None) else []
-        )
+        # all assistant accounts from clients.py (shared pool list)
+        self.assistants = hellbot.users
 
-        # one PyTgCalls client per assistant
+        # one PyTgCalls client per assistant (same index as the assistant)
         self._music_clients = [PyTgCalls(client) for client in self.assistants]
 
         # backwards compatible primary client (assistant #1)
         self.music = self._music_clients[0] if self._music_clients else None
 
+        # per slot state → idle / online / draining / dead / removed
+        self.states = {}
+
+        # handlers registered by plugins, applied to every (also hot added) client
+        self._binders = []
+        self._starting = {}
+        self.failures = {}
+        self.failovers = {}  # assistant index -> running failover task
+        self.migrations = asyncio.Semaphore(max(Config.MIGRATE_LIMIT, 1))
+
+        # gapless transitions: next track fetched before the current one ends
+        self.prepared = {}  # chat_id -> {"entry": queue entry, "file": path}
+        self.preparing = {}  # chat_id -> task fetching the next track
+        self.gaps = deque(maxlen=100)  # seconds between stream end and next stream
+        self.transitions = {"total": 0, "prepared": 0}
+
+        # chat_id -> local file being streamed, reused by seek / replay
+        self.streaming = {}
+        self.quality = QualityController()
+
         # per chat mapping → assigned assistant index
         self._chat_assistant = {}
-        self._rr_counter = 0
+        self.scheduler = AssistantScheduler()
+
+        # chat_id -> user ids in the VC, kept up to date from participant updates
+        self.participants = {}
+
+        # join_gc caches: (chat_id, assistant id) -> time membership was confirmed,
+        # chat_id -> chat object / invite link. Dropped on left/kicked updates and failures.
+        self.members = {}
+        self.chat_info = {}
+        self.invites = {}
+
+        # chats whose assistant stays in VC for a while after the queue ended
+        self.lingering = set()
+
+    # ---------- internal placement helpers ----------
+    def _candidates(self, spawn: bool = False) -> list:
+        online = [i for i, x in self.states.items() if x == "online"]
+        idle = [i for i, x in self.states.items() if x == "idle"]
+        if not spawn or not idle:
+            return online
+        if online and min(self.scheduler.load(i) for i in online) < Config.ASSISTANT_SPAWN_LOAD:
+            return online
+        return online + idle[:1]
+
+    def _members_of(self, chat_id) -> set:
+        # assistants join_gc recently confirmed in the chat, they need no join
+        now = time.time()
+        return {
+            i
+            for i, x in enumerate(self.assistants)
+            if now - self.members.get((chat_id, getattr(x, "id", None)), 0)
+            < Config.MEMBER_CACHE_TIME
+        }
+
+    def _assign(self, chat_id, spawn: bool = False):
+        if chat_id not in self._chat_assistant and self.assistants:
+            index = self.scheduler.pick(
+                chat_id, self._candidates(spawn), self._members_of(chat_id)
+            )
+            if index is None:
+                return
+            self._chat_assistant[chat_id] = index
 
-        self.audience = {}
+    def _release(self, chat_id):
+        self._chat_assistant.pop(chat_id, None)
+        self.scheduler.release(chat_id)
 
-    # ---------- internal round robin helper ----------
-    def _assign_rr(self, chat_id):
-        if chat_id not in self._chat_assistant and self.assistants:
-            self._chat_assistant[chat_id] = self._rr_counter % len(self.assistants)
-            self._rr_counter += 1
+    def _record_error(self, chat_id, wait: int = 0):
+        index = self._chat_assistant.get(chat_id)
+        if index is not None:
+            self.scheduler.record_error(index, wait)
 
     def _get_assistant(self, chat_id):
         if not self.assistants:
             return hellbot.user
-        self._assign_rr(chat_id)
+        self._assign(chat_id)
+        if chat_id not in self._chat_assistant:
+            raise UserException("[UserException]: No assistant is available right now!")
         return self.assistants[self._chat_assistant[chat_id]]
 
     def _get_music(self, chat_id):
         if not self._music_clients:
             return self.music
-        self._assign_rr(chat_id)
+        self._assign(chat_id)
+        if chat_id not in self._chat_assistant:
+            raise UserException("[UserException]: No assistant is available right now!")
         return self._music_clients[self._chat_assistant[chat_id]]
 
+    async def _prepare(self, chat_id):
+        # place the chat (possibly on an idle assistant) and make sure it is online
+        self._assign(chat_id, True)
+        if chat_id not in self._chat_assistant:
+            raise UserException("[UserException]: No assistant is available right now!")
+        index = self._chat_assistant[chat_id]
+        if self.states.get(index) == "idle":
+            lock = self._starting.setdefault(index, asyncio.Lock())
+            async with lock:
+                try:
+                    if self.states.get(index) == "idle":
+                        await self._start_slot(index)
+                except Exception as e:
+                    self._release(chat_id)
+                    raise UserException(
+                        f"[UserException]: Failed to start assistant: {e}"
+                    )
+        return self._music_clients[index]
+
+    def _avoid(self, chat_id) -> bool:
+        # stop using the placed assistant for this chat; True if another one is left
+        index = self._chat_assistant.get(chat_id)
+        if index is not None:
+            self.scheduler.avoid(chat_id, index)
+        self._release(chat_id)
+        return any(
+            not self.scheduler.is_avoided(chat_id, i) for i in self._candidates(True)
+        )
+
+    async def _ensure_member(self, chat_id):
+        # make sure the placed assistant is in the chat, failing over to another
+        # assistant when this one is banned or rate-limited there
+        while True:
+            music = await self._prepare(chat_id)
+            try:
+                await self.join_gc(chat_id)
+                return music
+            except AssistantException:
+                if not self._avoid(chat_id):
+                    raise
+
+    def music_of(self, chat_id):
+        index = self._chat_assistant.get(chat_id)
+        if index is None:
+            return None
+        return self._music_clients[index]
+
+    def assistant_of(self, chat_id) -> str:
+        index = self._chat_assistant.get(chat_id)
+        if index is None:
+            return "None"
+        return f"#{index + 1}"
+
+    def assistant_load(self) -> list:
+        collection = []
+        for idx, assistant in enumerate(self.assistants):
+            if self.states.get(idx) == "removed":
+                continue
+            context = self.scheduler.stats(idx)
+            context["index"] = idx + 1
+            context["name"] = getattr(assistant, "name", None) or f"Assistant {idx + 1}"
+            context["state"] = self.states.get(idx, "idle")
+            collection.append(context)
+        return collection
+
+    # ---------- assistant pool ----------
+    def bind(self, binder):
+        """Register a function that attaches handlers to a PyTgCalls client."""
+        self._binders.append(binder)
+        for client in self._music_clients:
+            binder(client)
+
+    def _sync_pool(self):
+        # create PyTgCalls clients for assistants added to the pool
+        for idx in range(len(self._music_clients), len(self.assistants)):
+            client = PyTgCalls(self.assistants[idx])
+            self._music_clients.append(client)
+            for binder in self._binders:
+                binder(client)
+        for idx in range(len(self.assistants)):
+            self.states.setdefault(idx, "idle")
+
+    async def _start_slot(self, index: int):
+        await hellbot.start_user(self.assistants[index])
+        await self._music_clients[index].start()
+        self.states[index] = "online"
+        if self.music is None or self.states.get(self._music_clients.index(self.music)) != "online":
+            self.music = self._music_clients[index]
+        LOGS.info(
+            f">> PyTgCalls Client #{index + 1} ({getattr(self.assistants[index], 'username', 'unknown')}) is online!"
+        )
+
+    async def add_assistant(self, session: str) -> int:
+        # slot indexes are positions in the pool, a removed slot of the same
+        # session is brought back instead of appending a duplicate
+        index = next(
+            (i for i, x in enumerate(self.assistants) if x.session_key == session), None
+        )
+        if index is None:
+            user_client = hellbot.add_user(session, source="database")
+            self._sync_pool()
+            index = self.assistants.index(user_client)
+        elif self.states.get(index) != "removed":
+            raise UserException("[UserException]: This assistant is already in the pool.")
+        self.assistants[index].source = "database"
+        try:
+            await self._revive(index)
+        except Exception as e:
+            self.states[index] = "removed"
+            raise UserException(f"[UserException]: Failed to start assistant: {e}")
+        await db.add_assistant_session(session)
+        return index
+
+    async def drain_assistant(self, index: int) -> tuple:
+        """Move all chats off an assistant, then stop and forget it."""
+        if self.states.get(index) in (None, "removed"):
+            raise UserException("[UserException]: No such assistant in the pool.")
+        self.states[index] = "draining"
+        chats = [c for c, i in self._chat_assistant.items() if i == index]
+        moved = await self._migrate_all(chats)
+        failed = len(chats) - moved
+        await hellbot.stop_user(self.assistants[index])
+        self.states[index] = "removed"
+        self.scheduler.forget(index)
+        if self.assistants[index].source == "database":
+            await db.remove_assistant_session(self.assistants[index].session_key)
+        online = self._candidates()
+        if online and self.music is self._music_clients[index]:
+            self.music = self._music_clients[online[0]]
+        return moved, failed
+
+    async def _migrate(self, chat_id: int) -> bool:
+        async with self.migrations:
+            try:
+                return await mailbox.post(chat_id, "migrate", self.migrate_vc, chat_id)
+            except Exception:
+                return False
+
+    async def _migrate_all(self, chats: list) -> int:
+        # chats move in parallel, MIGRATE_LIMIT at a time
+        results = await asyncio.gather(*(self._migrate(x) for x in chats))
+        return sum(1 for x in results if x)
+
+    async def migrate_vc(self, chat_id: int) -> bool:
+        """Move a chat to another assistant and resume the current track at its position."""
+        old = self._chat_assistant.get(chat_id)
+        if old is None:
+            return False
+        que = Queue.get_current(chat_id)
+        if not que:
+            # lingering after the queue ended, nothing to resume: just let it go
+            await self.leave_vc(chat_id)
+            return True
+        try:
+            await asyncio.wait_for(self._music_clients[old].leave_group_call(chat_id), 10)
+        except Exception:
+            pass
+        self._release(chat_id)
+
+        video = True if que["vc_type"] == "video" else False
+        try:
+            if que["file"] == que["video_id"]:
+                file_path = await ytube.download(que["video_id"], True, video)
+            else:
+                file_path = que["file"]
+            await self._ensure_member(chat_id)
+            await self.join_vc(chat_id, file_path, video, int(que["played"]))
+        except Exception as e:
+            LOGS.error(f">> Failed to migrate chat {chat_id}: {e}")
+            await self.leave_vc(chat_id)
+            return False
+        LOGS.info(f">> Migrated chat {chat_id} to assistant {self.assistant_of(chat_id)}")
+        return True
+
+    # ---------- assistant health ----------
+    async def _probe(self, index: int) -> str:
+        try:
+            await asyncio.wait_for(self.assistants[index].get_me(), 15)
+            await asyncio.wait_for(self._music_clients[index].ping, 15)
+        except (AuthKeyUnregistered, SessionRevoked, UserDeactivated, UserDeactivatedBan):
+            return "fatal"
+        except FloodWait:
+            return "ok"
+        except Exception:
+            return "fail"
+        return "ok"
+
+    async def _revive(self, index: int):
+        await hellbot.stop_user(self.assistants[index])
+        client = PyTgCalls(self.assistants[index])
+        for binder in self._binders:
+            binder(client)
+        if self.music is self._music_clients[index]:
+            self.music = client
+        self._music_clients[index] = client
+        await self._start_slot(index)
+        self.failures[index] = 0
+
+    async def failover(self, index: int, fatal: bool = False):
+        """Take an assistant out of rotation and move its chats to healthy ones."""
+        self.states[index] = "removed" if fatal else "dead"
+        chats = [c for c, i in self._chat_assistant.items() if i == index]
+        LOGS.warning(
+            f">> Assistant #{index + 1} is {self.states[index]}! Moving {len(chats)} chat(s)."
+        )
+        moved = await self._migrate_all(chats)
+        if fatal:
+            await hellbot.stop_user(self.assistants[index])
+            self.scheduler.forget(index)
+        online = self._candidates()
+        if online and self.music is self._music_clients[index]:
+            self.music = self._music_clients[online[0]]
+        try:
+            await hellbot.logit(
+                "failover",
+                f"**⤷ Assistant:** #{index + 1} ({getattr(self.assistants[index], 'name', 'unknown')})\n"
+                f"**⤷ State:** {self.states[index]}\n"
+                f"**⤷ Chats Moved:** {moved}/{len(chats)}",
+            )
+        except Exception:
+            pass
+
+    async def check_health(self):
+        for index, state in list(self.states.items()):
+            if state == "online":
+                status = await self._probe(index)
+                if status == "ok":
+                    self.failures[index] = 0
+                    continue
+                self.failures[index] = self.failures.get(index, 0) + 1
+                if status == "fatal" or self.failures[index] >= Config.HEALTH_FAILURES:
+                    # state changes at once, chats move in the background
+                    self.states[index] = "removed" if status == "fatal" else "dead"
+                    self.failovers[index] = asyncio.create_task(
+                        self.failover(index, status == "fatal")
+                    )
+            elif state == "dead":
+                task = self.failovers.get(index)
+                if task and not task.done():
+                    continue
+                self.failovers.pop(index, None)
+                try:
+                    await self._revive(index)
+                    LOGS.info(f">> Assistant #{index + 1} recovered!")
+                except Exception:
+                    pass
+
     # --------------------------------------------------
 
     async def autoend(self, chat_id: int, users: list):
@@ -91,14 +415,56 @@ class HellMusic(PyTgCalls):
         assistant = self._get_assistant(chat_id)
         assistant_id = getattr(assistant, "id", None)
 
+        key = ("autoend", chat_id)
         if len(users) == 1 and users[0] == assistant_id:
-            db.inactive[chat_id] = datetime.datetime.now() + datetime.timedelta(
-                minutes=5
-            )
+            if chat_id in self.lingering:
+                # nobody to wait for, don't linger in an empty VC
+                timers.schedule(("linger", chat_id), 0, self._linger_expire, chat_id)
+                return
+            if not timers.pending(key):
+                timers.schedule(key, 300, self._end_inactive, chat_id)
         else:
-            db.inactive[chat_id] = {}
+            timers.cancel(key)
+
+    async def _end_inactive(self, chat_id: int):
+        if not await db.get_autoend() or not await db.is_active_vc(chat_id):
+            return
+        try:
+            await mailbox.post(
+                chat_id, "leave", self.leave_vc, chat_id, supersedes=("change",)
+            )
+        except Exception:
+            return
+        try:
+            await hellbot.app.send_message(
+                chat_id, "⏹️ **Inactive VC:** Streaming has been stopped!"
+            )
+        except Exception:
+            pass
+
+    async def gc(self):
+        """Drop expired entries of the in-memory caches."""
+        now = time.time()
+        for key, seen in list(self.members.items()):
+            if now - seen >= Config.MEMBER_CACHE_TIME:
+                self.members.pop(key, None)
+        for chat_id, avoided in list(self.scheduler.avoided.items()):
+            for index, until in list(avoided.items()):
+                if until <= now:
+                    avoided.pop(index, None)
+            if not avoided:
+                self.scheduler.avoided.pop(chat_id, None)
+        active = db.sessions
+        for chat_id in list(self.participants):
+            if chat_id not in active and chat_id not in self.lingering:
+                self.participants.pop(chat_id, None)
+        for chat_id in list(self.chat_info):
+            if chat_id not in active:
+                self.chat_info.pop(chat_id, None)
+        transcoder.evict(list(self.streaming.values()))
 
     async def autoclean(self, file: str):
+        transcoder.remove(file)
         try:
             os.remove(file)
             os.remove(f"downloads/{file}.webm")
@@ -108,38 +474,26 @@ class HellMusic(PyTgCalls):
 
     async def start(self):
         LOGS.info(">> Booting PyTgCalls Clients...")
+        self._sync_pool()
         if not self._music_clients:
             LOGS.error(">> No assistant sessions detected!")
             quit(1)
 
-        alive_music = []
-        alive_assistants = []
-
-        for idx, (client, assistant) in enumerate(
-            zip(self._music_clients, self.assistants), start=1
-        ):
-            try:
-                await client.start()
-                alive_music.append(client)
-                alive_assistants.append(assistant)
-                LOGS.info(
-                    f">> PyTgCalls Client #{idx} ({getattr(assistant, 'username', 'unknown')}) is online!"
-                )
-            except Exception as e:
+        started = [i for i, x in enumerate(self.assistants) if x.started]
+        results = await asyncio.gather(
+            *(self._start_slot(idx) for idx in started), return_exceptions=True
+        )
+        for idx, result in zip(started, results):
+            if isinstance(result, Exception):
+                self.states[idx] = "removed"
                 LOGS.error(
-                    f">> Failed to start PyTgCalls client #{idx} ({getattr(assistant, 'username', 'unknown')}): {e}"
+                    f">> Failed to start PyTgCalls client #{idx + 1} ({getattr(self.assistants[idx], 'username', 'unknown')}): {result}"
                 )
 
-        self._music_clients = alive_music
-        self.assistants = alive_assistants
-
-        if not self._music_clients:
+        if not self._candidates(True):
             LOGS.error(">> All PyTgCalls clients failed to start. Exiting.")
             quit(1)
 
-        # refresh primary for ping()
-        self.music = self._music_clients[0]
-
     async def ping(self):
         return await self.music.ping
 
@@ -147,6 +501,31 @@ class HellMusic(PyTgCalls):
         music = self._get_music(chat_id)
         return await music.get_participants(chat_id)
 
+    async def reconcile_participants(self, chat_id: int) -> set:
+        """Full participants fetch, the tracked set is rebuilt from it."""
+        users = await self.vc_participants(chat_id)
+        self.participants[chat_id] = {u.user_id for u in users}
+        return self.participants[chat_id]
+
+    async def participant_ids(self, chat_id: int) -> set:
+        if chat_id not in self.participants:
+            try:
+                await self.reconcile_participants(chat_id)
+            except Exception:
+                return set()
+        return self.participants[chat_id]
+
+    def participant_update(self, chat_id: int, user_id: int, joined: bool):
+        """Apply one join / leave update, None if the chat is not tracked yet."""
+        users = self.participants.get(chat_id)
+        if users is None:
+            return None
+        if joined:
+            users.add(user_id)
+        else:
+            users.discard(user_id)
+        return users
+
     async def mute_vc(self, chat_id: int):
         music = self._get_music(chat_id)
         await music.mute_stream(chat_id)
@@ -164,12 +543,20 @@ class HellMusic(PyTgCalls):
         await music.resume_stream(chat_id)
 
     async def leave_vc(self, chat_id: int, force: bool = False):
+        self.lingering.discard(chat_id)
+        timers.cancel(("linger", chat_id))
+        timers.cancel(("autoend", chat_id))
         try:
             await __clean__(chat_id, force)
-            music = self._get_music(chat_id)
-            await music.leave_group_call(chat_id)
+            index = self._chat_assistant.get(chat_id)
+            if index is not None:
+                await self._music_clients[index].leave_group_call(chat_id)
         except:
             pass
+        self._release(chat_id)
+        self.prepared.pop(chat_id, None)
+        self.streaming.pop(chat_id, None)
+        self.participants.pop(chat_id, None)
         previous = Config.PLAYER_CACHE.get(chat_id)
         if previous:
             try:
@@ -177,25 +564,68 @@ class HellMusic(PyTgCalls):
             except:
                 pass
 
-    async def seek_vc(self, context: dict):
-        chat_id, file_path, duration, to_seek, video = context.values()
+    async def _stream(self, chat_id: int, file_path: str, video: bool, seek: int = 0):
+        params = {"additional_ffmpeg_parameters": f"-ss {seek}"} if seek else {}
+        audio_q, video_q = self.quality.effective(chat_id, video)
+        if video_q:
+            return AudioVideoPiped(file_path, audio_q, video_q, **params)
+        cached = transcoder.cached(file_path)
+        if not cached and any(
+            c != chat_id and f == file_path for c, f in self.streaming.items()
+        ):
+            # same track is live in another chat, later chats reuse one wav copy
+            cached = transcoder.reuse(file_path)
+        return AudioPiped(cached or file_path, audio_q, **params)
+
+    async def restream(self, chat_id: int):
+        """Restart the current track at its position with the chat's current quality."""
+        que = Queue.get_current(chat_id)
+        if not que:
+            return
+        video = True if que["vc_type"] == "video" else False
+        file_path = await self.current_media(chat_id)
+        stream = await self._stream(chat_id, file_path, video, int(que["played"]))
+        await self._get_music(chat_id).change_stream(chat_id, stream)
+        self._track(chat_id, file_path, video)
+
+    async def adapt_quality(self):
+        if not self.quality.sample():
+            return
+        LOGS.info(f">> CPU quality step is now {self.quality.step}, re-streaming video chats.")
+        for chat_id in db.sessions.of_type("video"):
+            try:
+                await mailbox.post(chat_id, "restream", self.restream, chat_id)
+            except Exception as e:
+                LOGS.warning(f">> Failed to restream {chat_id}: {e}")
 
+    def _track(self, chat_id: int, file_path: str, video: bool):
+        self.streaming[chat_id] = file_path
         if video:
-            stream = AudioVideoPiped(
-                file_path,
-                MediumQualityAudio(),
-                MediumQualityVideo(),
-                additional_ffmpeg_parameters=f"-ss {to_seek} -to {duration}",
-            )
-        else:
-            stream = AudioPiped(
-                file_path,
-                MediumQualityAudio(),
-                additional_ffmpeg_parameters=f"-ss {to_seek} -to {duration}",
-            )
-
+            asyncio.create_task(seeker.build(file_path))
+        elif transcoder.enabled:
+            asyncio.create_task(transcoder.prepare(file_path))
+
+    async def current_media(self, chat_id: int) -> str:
+        """Local file of the current track, downloaded again only if it is gone."""
+        file_path = self.streaming.get(chat_id)
+        if file_path and os.path.exists(file_path):
+            return file_path
+        return await self._media_of(Queue.get_current(chat_id))
+
+    async def seek_vc(self, context: dict) -> int:
+        chat_id = context["chat_id"]
+        file_path = context["file"]
+        video = context["video"]
+
+        # ffmpeg input seek (-ss before -i) jumps straight to the position,
+        # for video start at a keyframe so the stream begins clean
+        to_seek = seeker.position(file_path, context["seek"]) if video else context["seek"]
+
+        stream = await self._stream(chat_id, file_path, video, to_seek)
         music = self._get_music(chat_id)
         await music.change_stream(chat_id, stream)
+        self._track(chat_id, file_path, video)
+        return to_seek
 
     async def invited_vc(self, chat_id: int):
         try:
@@ -206,22 +636,104 @@ class HellMusic(PyTgCalls):
             pass
 
     async def replay_vc(self, chat_id: int, file_path: str, video: bool = False):
-        if video:
-            stream = AudioVideoPiped(
-                file_path, MediumQualityAudio(), MediumQualityVideo()
-            )
-        else:
-            stream = AudioPiped(file_path, MediumQualityAudio())
-
+        stream = await self._stream(chat_id, file_path, video)
         music = self._get_music(chat_id)
         await music.change_stream(chat_id, stream)
+        self._track(chat_id, file_path, video)
+
+    # ====================== LINGER ============================
+    async def linger(self, chat_id: int):
+        """Queue ended: stay in the VC for LINGER_TIME so the next play starts instantly."""
+        if not Config.LINGER_TIME or chat_id not in self._chat_assistant:
+            return await self.leave_vc(chat_id)
+        await __clean__(chat_id, False)
+        self.scheduler.release(chat_id)
+        self.prepared.pop(chat_id, None)
+        self.streaming.pop(chat_id, None)
+        previous = Config.PLAYER_CACHE.pop(chat_id, None)
+        if previous:
+            try:
+                await previous.delete()
+            except:
+                pass
+        self.lingering.add(chat_id)
+        timers.schedule(("linger", chat_id), Config.LINGER_TIME, self._linger_expire, chat_id)
+
+    async def _linger_expire(self, chat_id: int):
+        await mailbox.post(chat_id, "leave", self._leave_lingering, chat_id)
+
+    async def _leave_lingering(self, chat_id: int):
+        # checked inside the transition, a /play queued before it may have resumed the chat
+        if chat_id in self.lingering:
+            await self.leave_vc(chat_id)
+
+    def _resume_linger(self, chat_id: int) -> bool:
+        if chat_id not in self.lingering:
+            return False
+        self.lingering.discard(chat_id)
+        timers.cancel(("linger", chat_id))
+        return chat_id in self._chat_assistant
 
     # ====================== CHANGE VC ============================
+    async def _media_of(self, entry: dict) -> str:
+        if entry["video_id"] == "telegram":
+            return entry["file"]
+        return await ytube.download(
+            entry["video_id"], True, True if entry["vc_type"] == "video" else False
+        )
+
+    def _upcoming(self, chat_id: int):
+        que = Queue.get_queue(chat_id)
+        if db.loop.get(chat_id):
+            return que[0] if que else None
+        return que[1] if len(que) > 1 else None
+
+    def should_prepare(self, chat_id: int) -> bool:
+        if not Config.PRELOAD_TIME or chat_id in self.preparing:
+            return False
+        entry = self._upcoming(chat_id)
+        prepared = self.prepared.get(chat_id)
+        if entry is None or (prepared and prepared["entry"] is entry):
+            return False
+        que = Queue.get_queue(chat_id)
+        try:
+            left = formatter.mins_to_secs(que[0]["duration"]) - que[0]["played"]
+        except (ValueError, AttributeError):
+            return False
+        return left <= Config.PRELOAD_TIME
+
+    async def prepare_next(self, chat_id: int):
+        """Fetch the upcoming track before the current one ends."""
+        entry = self._upcoming(chat_id)
+        prepared = self.prepared.get(chat_id)
+        if entry is None or (prepared and prepared["entry"] is entry):
+            return
+        self.preparing[chat_id] = asyncio.current_task()
+        try:
+            file_path = await self._media_of(entry)
+            if entry["vc_type"] != "video":
+                await transcoder.prepare(file_path)
+            self.prepared[chat_id] = {"entry": entry, "file": file_path}
+        except Exception as e:
+            LOGS.warning(f">> Failed to prepare next track in {chat_id}: {e}")
+        finally:
+            self.preparing.pop(chat_id, None)
+
+    def transition_stats(self) -> dict:
+        gaps = list(self.gaps)
+        return {
+            "total": self.transitions["total"],
+            "prepared": self.transitions["prepared"],
+            "avg": round(sum(gaps) / len(gaps) * 1000) if gaps else 0,
+            "max": round(max(gaps) * 1000) if gaps else 0,
+        }
+
     async def change_vc(self, chat_id: int):
+        started = time.perf_counter()
         try:
             get = Queue.get_queue(chat_id)
             if get == []:
-                return await self.leave_vc(chat_id)
+                return await self.linger(chat_id)
 
             loop = await db.get_loop(chat_id)
 
@@ -237,42 +749,53 @@ class HellMusic(PyTgCalls):
 
         get = Queue.get_queue(chat_id)
         if get == []:
-            return await self.leave_vc(chat_id)
-
-        chat_id = get[0]["chat_id"]
-        duration = get[0]["duration"]
-        queue = get[0]["file"]
-        title = get[0]["title"]
-        user_id = get[0]["user_id"]
-        vc_type = get[0]["vc_type"]
-        video_id = get[0]["video_id"]
+            return await self.linger(chat_id)
 
-        try:
-            user = (await hellbot.app.get_users(user_id)).mention(style="md")
-        except:
-            user = get[0]["user"]
+        entry = get[0]
+        vc_type = entry["vc_type"]
 
-        tg = True if video_id == "telegram" else False
+        # the next track may still be on its way, wait for it instead of fetching it twice
+        preparing = self.preparing.get(chat_id)
+        if preparing is not None:
+            await asyncio.shield(preparing)
 
-        if tg:
-            to_stream = queue
+        # switch first, everything user facing happens after the new stream is live
+        prepared = self.prepared.pop(chat_id, None)
+        if prepared and prepared["entry"] is entry and os.path.exists(prepared["file"]):
+            to_stream = prepared["file"]
+            self.transitions["prepared"] += 1
         else:
-            to_stream = await ytube.download(
-                video_id, True, True if vc_type == "video" else False
-            )
+            to_stream = await self._media_of(entry)
 
-        if vc_type == "video":
-            input_stream = AudioVideoPiped(
-                to_stream, MediumQualityAudio(), MediumQualityVideo()
-            )
-        else:
-            input_stream = AudioPiped(to_stream, MediumQualityAudio())
+        input_stream = await self._stream(chat_id, to_stream, vc_type == "video")
 
         try:
-            photo = thumb.generate(video_id)
             music = self._get_music(chat_id)
             await music.change_stream(int(chat_id), input_stream)
+            self.scheduler.attach(self._chat_assistant[chat_id], chat_id, vc_type)
+            await db.add_active_vc(chat_id, vc_type, self._chat_assistant[chat_id])
+        except Exception as e:
+            raise ChangeVCException(f"[ChangeVCException]: {e}")
+        self._track(chat_id, to_stream, vc_type == "video")
+
+        self.gaps.append(time.perf_counter() - started)
+        self.transitions["total"] += 1
+        asyncio.create_task(self._now_playing(chat_id, entry))
+
+    async def _now_playing(self, chat_id: int, entry: dict):
+        duration = entry["duration"]
+        title = entry["title"]
+        user_id = entry["user_id"]
+        vc_type = entry["vc_type"]
+        video_id = entry["video_id"]
+
+        try:
+            user = (await hellbot.app.get_users(user_id)).mention(style="md")
+        except:
+            user = entry["user"]
 
+        try:
+            photo = thumb.generate(video_id)
             btns = Buttons.player_markup(
                 chat_id,
                 "None" if video_id == "telegram" else video_id,
@@ -313,8 +836,7 @@ class HellMusic(PyTgCalls):
                     pass
 
             Config.PLAYER_CACHE[chat_id] = sent
-            await db.update_songs_count(1)
-            await db.update_user(user_id, "songs_played", 1)
+            db.count_play(user_id)
 
             chat_name = (await hellbot.app.get_chat(chat_id)).title
             await hellbot.logit(
@@ -322,18 +844,31 @@ class HellMusic(PyTgCalls):
                 f"**⤷ Song:** `{title}` \n**⤷ Chat:** {chat_name} [`{chat_id}`] \n**⤷ User:** {user}",
             )
         except Exception as e:
-            raise ChangeVCException(f"[ChangeVCException]: {e}")
+            LOGS.error(f"[ChangeVCException]: {e}")
 
     # ====================== JOIN VC ============================
-    async def join_vc(self, chat_id: int, file_path: str, video: bool = False):
-        if video:
-            stream = AudioVideoPiped(
-                file_path, MediumQualityAudio(), MediumQualityVideo()
-            )
-        else:
-            stream = AudioPiped(file_path, MediumQualityAudio())
+    async def join_vc(
+        self, chat_id: int, file_path: str, video: bool = False, seek: int = 0
+    ):
+        # resume from a position (used when moving a chat between assistants)
+        stream = await self._stream(chat_id, file_path, video, seek)
+
+        # assistant is still lingering in the VC, just start the new stream
+        if self._resume_linger(chat_id):
+            try:
+                await self._get_music(chat_id).change_stream(chat_id, stream)
+                await db.add_active_vc(
+                    chat_id, "video" if video else "voice", self._chat_assistant.get(chat_id)
+                )
+                self._track(chat_id, file_path, video)
+                self.scheduler.attach(
+                    self._chat_assistant[chat_id], chat_id, "video" if video else "voice"
+                )
+                return
+            except Exception:
+                pass
 
-        music = self._get_music(chat_id)
+        music = await self._prepare(chat_id)
 
         try:
             await music.join_group_call(
@@ -343,9 +878,10 @@ class HellMusic(PyTgCalls):
         except NoActiveGroupCall:
             # No active VC yet – try to ensure assistant is in the chat, then retry
             try:
-                await self.join_gc(chat_id)
+                music = await self._ensure_member(chat_id)
             except Exception as e:
                 # Do not clear queues here; just bubble readable error
+                self._release(chat_id)
                 raise JoinGCException(f"[JoinGCException]: {e}")
 
             try:
@@ -353,6 +889,9 @@ class HellMusic(PyTgCalls):
                     chat_id, stream, stream_type=StreamType().pulse_stream
                 )
             except Exception as e:
+                self.forget_member(chat_id)
+                self._record_error(chat_id)
+                self._release(chat_id)
                 raise JoinVCException(f"[JoinVCException]: {e}")
 
         except AlreadyJoinedError:
@@ -363,16 +902,34 @@ class HellMusic(PyTgCalls):
                 raise UserException(f"[UserException]: {e}")
 
         except Exception as e:
+            self._record_error(chat_id)
+            self._release(chat_id)
             raise UserException(f"[UserException]: {e}")
 
-        await db.add_active_vc(chat_id, "video" if video else "voice")
-        self.audience[chat_id] = {}
-
-        users = await self.vc_participants(chat_id)
-        user_ids = [u.user_id for u in users]
-        await self.autoend(chat_id, user_ids)
+        await db.add_active_vc(
+            chat_id, "video" if video else "voice", self._chat_assistant.get(chat_id)
+        )
+        self._track(chat_id, file_path, video)
+        self.scheduler.attach(
+            self._chat_assistant[chat_id], chat_id, "video" if video else "voice"
+        )
+        users = await self.reconcile_participants(chat_id)
+        await self.autoend(chat_id, list(users))
 
     # ====================== JOIN GC ============================
+    def forget_member(self, chat_id: int, user_id: int = None):
+        for key in [
+            k for k in self.members if k[0] == chat_id and user_id in (None, k[1])
+        ]:
+            self.members.pop(key, None)
+
+    async def _get_chat(self, chat_id: int):
+        chat = self.chat_info.get(chat_id)
+        if chat is None:
+            chat = await hellbot.app.get_chat(chat_id)
+            self.chat_info[chat_id] = chat
+        return chat
+
     async def join_gc(self, chat_id: int):
         """
         Make the correct assistant join the chat.
@@ -380,6 +937,9 @@ class HellMusic(PyTgCalls):
         - If approvals are enabled: assistant sends request, bot tries to approve it
         """
         assistant = self._get_assistant(chat_id)
+        key = (chat_id, assistant.id)
+        if time.time() - self.members.get(key, 0) < Config.MEMBER_CACHE_TIME:
+            return
 
         # 1) Check if assistant is already in the chat
         try:
@@ -395,14 +955,15 @@ class HellMusic(PyTgCalls):
         else:
             # No exception: assistant *is* in chat already
             if member.status in (ChatMemberStatus.RESTRICTED, ChatMemberStatus.BANNED):
-                raise UserException(
-                    "[UserException]: Assistant is restricted or banned in this chat."
+                raise AssistantException(
+                    "[AssistantException]: Assistant is restricted or banned in this chat."
                 )
             # already a member and not restricted → nothing to do
+            self.members[key] = time.time()
             return
 
         # 2) Assistant is not participant → try to join
-        chat = await hellbot.app.get_chat(chat_id)
+        chat = await self._get_chat(chat_id)
 
         # Public chat with username
         if chat.username:
@@ -417,15 +978,20 @@ class HellMusic(PyTgCalls):
                     # ignore if no pending request / no rights
                     pass
 
+                self.members[key] = time.time()
+
             except UserAlreadyParticipant:
                 # rare race: joined between get_chat_member and here
-                pass
+                self.members[key] = time.time()
             except FloodWait as fw:
-                raise UserException(
-                    f"[UserException]: Assistant is being rate-limited by Telegram. "
+                self._record_error(chat_id, fw.value)
+                raise AssistantException(
+                    f"[AssistantException]: Assistant is being rate-limited by Telegram. "
                     f"Please wait {fw.value} seconds or add @{assistant.username} manually."
                 )
             except Exception:
+                # username may have changed
+                self.chat_info.pop(chat_id, None)
                 raise UserException(
                     "[UserException]: Failed to add assistant to chat. "
                     "Please add it manually and try again."
@@ -435,9 +1001,10 @@ class HellMusic(PyTgCalls):
         else:
             try:
                 try:
-                    link = chat.invite_link
+                    link = self.invites.get(chat_id) or chat.invite_link
                     if link is None:
                         link = await hellbot.app.export_chat_invite_link(chat_id)
+                    self.invites[chat_id] = link
                 except ChatAdminRequired:
                     raise UserException(
                         "[UserException]: Bot is not admin and cannot export invite link. "
@@ -466,21 +1033,27 @@ class HellMusic(PyTgCalls):
                     await invite_msg.edit_text(
                         "Assistant joined the chat! Enjoy your music!"
                     )
+                    self.members[key] = time.time()
 
                 except UserAlreadyParticipant:
                     await invite_msg.edit_text(
                         "Assistant is already in this chat. Enjoy your music!"
                     )
+                    self.members[key] = time.time()
                 except FloodWait as fw:
+                    self._record_error(chat_id, fw.value)
                     await invite_msg.edit_text(
                         f"Assistant is being rate-limited by Telegram.\n\n"
                         f"• Please wait **{fw.value} seconds**, or\n"
                         f"• Manually add @{assistant.username} to this chat and promote it."
                     )
-                    raise UserException(
-                        "[UserException]: Assistant hit FloodWait while joining via invite link."
+                    raise AssistantException(
+                        "[AssistantException]: Assistant hit FloodWait while joining via invite link."
                     )
                 except Exception:
+                    # link may be revoked, export a fresh one next time
+                    self.invites.pop(chat_id, None)
+                    self.chat_info.pop(chat_id, None)
                     await invite_msg.edit_text(
                         "Failed to auto-add assistant. "
                         f"Please add @{assistant.username} manually and try again."
@@ -492,9 +1065,12 @@ class HellMusic(PyTgCalls):
             except UserAlreadyParticipant:
                 # safety fallback
                 pass
+            except AssistantException:
+                raise
             except FloodWait as fw:
-                raise UserException(
-                    f"[UserException]: Assistant is currently rate-limited by Telegram. "
+                self._record_error(chat_id, fw.value)
+                raise AssistantException(
+                    f"[AssistantException]: Assistant is currently rate-limited by Telegram. "
                     f"Please wait {fw.value} seconds or add @{assistant.username} manually."
                 )
             except Exception:
@@ -1,8 +1,14 @@
+import asyncio
+import os
+import re
+
 from pyrogram import Client
 
 from config import Config
 from Music.utils.exceptions import HellBotException
 
+from .boot import boot
+from .database import db
 from .logger import LOGS
 
 
@@ -18,41 +24,117 @@ class HellClient(Client):
             workers=100,
         )
 
-        # --- MULTI ASSISTANT SUPPORT (UP TO 4) ---
-        # Collect all session strings that exist in Config
-        session_strings = []
-
-        # Old / primary session (backwards compatible)
-        if getattr(Config, "HELLBOT_SESSION", None):
-            session_strings.append(Config.HELLBOT_SESSION)
-
-        # Optional extra assistants
-        for attr in ("HELLBOT_SESSION2", "HELLBOT_SESSION3", "HELLBOT_SESSION4"):
-            if hasattr(Config, attr):
-                value = getattr(Config, attr)
-                if value:
-                    session_strings.append(value)
-
-        # Create assistant clients list
+        # --- ASSISTANT POOL (ANY SIZE) ---
+        # Sessions come from HELLBOT_SESSION* vars, the sessions directory and
+        # (at boot / runtime) the assistants collection in database.
         self.users = []
-        for idx, session in enumerate(session_strings, start=1):
-            self.users.append(
-                Client(
-                    f"HellClient{idx}",
-                    api_id=Config.API_ID,
-                    api_hash=Config.API_HASH,
-                    session_string=session,
-                    no_updates=True,
-                )
-            )
+        for session, workdir in self._local_sessions():
+            self.add_user(session, workdir)
 
         # Backwards compatibility: primary assistant
         self.user = self.users[0] if self.users else None
 
+    def _local_sessions(self) -> list:
+        sessions = []
+
+        # Old / primary session (backwards compatible)
+        if Config.HELLBOT_SESSION:
+            sessions.append((Config.HELLBOT_SESSION, None))
+
+        # HELLBOT_SESSION2, HELLBOT_SESSION3, ... without an upper limit
+        extra = [x for x in os.environ if re.fullmatch(r"HELLBOT_SESSION\d+", x)]
+        for attr in sorted(extra, key=lambda x: int(x[len("HELLBOT_SESSION") :])):
+            value = os.environ.get(attr)
+            if value:
+                sessions.append((value, None))
+
+        # sessions directory: pyrogram *.session files or *.txt string sessions
+        if os.path.isdir(Config.SESSIONS_DIR):
+            for file in sorted(os.listdir(Config.SESSIONS_DIR)):
+                path = os.path.join(Config.SESSIONS_DIR, file)
+                if file.endswith(".session"):
+                    sessions.append((file[: -len(".session")], Config.SESSIONS_DIR))
+                elif file.endswith(".txt"):
+                    with open(path, "r") as f:
+                        value = f.read().strip()
+                    if value:
+                        sessions.append((value, None))
+
+        return sessions
+
+    def add_user(self, session: str, workdir: str = None, source: str = "config"):
+        """
+        Register an assistant without starting it.
+        - session: string session, or the session file name when workdir is given
+        """
+        sessions = [getattr(x, "session_key", None) for x in self.users]
+        if session in sessions:
+            return None
+
+        idx = len(self.users) + 1
+        if workdir:
+            user_client = Client(
+                session,
+                api_id=Config.API_ID,
+                api_hash=Config.API_HASH,
+                workdir=workdir,
+                no_updates=True,
+            )
+        else:
+            user_client = Client(
+                f"HellClient{idx}",
+                api_id=Config.API_ID,
+                api_hash=Config.API_HASH,
+                session_string=session,
+                no_updates=True,
+            )
+        user_client.session_key = session
+        user_client.source = source
+        user_client.started = False
+        self.users.append(user_client)
+        return user_client
+
+    async def start_user(self, user_client: Client):
+        if user_client.started:
+            return
+        await user_client.start()
+        me = await user_client.get_me()
+        user_client.id = me.id
+        user_client.mention = me.mention
+        user_client.name = me.first_name
+        user_client.username = me.username
+        user_client.started = True
+
+        # nothing waits on these, don't hold up boot / playback for them
+        boot.spawn(self._join_channels(user_client), "join channels")
+
+        idx = self.users.index(user_client) + 1
+        LOGS.info(f">> Assistant {idx} ({user_client.name}) is online now!")
+
+    async def _join_channels(self, user_client: Client):
+        try:
+            await user_client.join_chat("ArcBotz")
+            await user_client.join_chat("ArcUpdates")
+        except Exception:
+            # Ignore join errors silently
+            pass
+
+    async def stop_user(self, user_client: Client):
+        if not user_client.started:
+            return
+        try:
+            await user_client.stop()
+        except Exception:
+            pass
+        user_client.started = False
+
     async def start(self):
         LOGS.info(">> Booting up HellMusic...")
+        await self.start_bot()
+        await self.start_assistants()
+        LOGS.info(">> Booted up HellMusic!")
 
-        # Start bot
+    async def start_bot(self):
         if Config.BOT_TOKEN:
             await self.app.start()
             me = await self.app.get_me()
@@ -62,29 +144,32 @@ class HellClient(Client):
             self.app.username = me.username
             LOGS.info(f">> {self.app.name} is online now!")
 
-        # Start all assistants (up to 4)
+    async def start_assistants(self):
+        # Assistants added at runtime are stored in database
+        try:
+            for session in await db.get_assistant_sessions():
+                self.add_user(session, source="database")
+        except Exception as e:
+            LOGS.warning(f">> Failed to load assistant sessions from database: {e}")
+
+        if self.user is None and self.users:
+            self.user = self.users[0]
+
+        # Start assistants concurrently; the rest are started on demand
         if self.users:
-            for idx, user_client in enumerate(self.users, start=1):
-                await user_client.start()
-                me = await user_client.get_me()
-                user_client.id = me.id
-                user_client.mention = me.mention
-                user_client.name = me.first_name
-                user_client.username = me.username
-
-                try:
-                    await user_client.join_chat("ArcBotz")
-                    await user_client.join_chat("ArcUpdates")
-                except Exception:
-                    # Ignore join errors silently
-                    pass
-
-                LOGS.info(f">> Assistant {idx} ({user_client.name}) is online now!")
+            count = Config.ASSISTANTS_ON_BOOT or len(self.users)
+            results = await asyncio.gather(
+                *(self.start_user(x) for x in self.users[:count]),
+                return_exceptions=True,
+            )
+            for result in results:
+                if isinstance(result, Exception):
+                    LOGS.error(f">> Failed to start assistant: {result}")
+            if count < len(self.users):
+                LOGS.info(f">> {len(self.users) - count} assistant(s) will start on demand.")
         else:
             LOGS.info(">> No assistant sessions configured (HELLBOT_SESSION*).")
 
-        LOGS.info(">> Booted up HellMusic!")
-
     async def logit(self, hash: str, log: str, file: str = None):
         log_text = f"#{hash.upper()} \n\n{log}"
         try:
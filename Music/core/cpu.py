@@ -0,0 +1,30 @@
+import psutil
+
+
+class CPUSampler:
+    """
+    Host CPU % since the previous call of this sampler.
+    psutil.cpu_percent(interval=None) keeps one baseline for the whole process,
+    so every caller resets it for the others; each consumer owns a sampler instead.
+    """
+
+    def __init__(self):
+        self.last = psutil.cpu_times()
+
+    @staticmethod
+    def _busy(times) -> tuple:
+        total = sum(times)
+        # guest time is already part of user time on linux
+        total -= getattr(times, "guest", 0) + getattr(times, "guest_nice", 0)
+        idle = times.idle + getattr(times, "iowait", 0)
+        return total, total - idle
+
+    def percent(self) -> float:
+        now = psutil.cpu_times()
+        total, busy = self._busy(now)
+        last_total, last_busy = self._busy(self.last)
+        self.last = now
+        if total <= last_total:
+            return 0.0
+        percent = (busy - last_busy) / (total - last_total) * 100
+        return round(min(max(percent, 0.0), 100.0), 1)
@@ -1,19 +1,57 @@
+import asyncio
 import datetime
 import sys
+import time
 
 from motor.motor_asyncio import AsyncIOMotorClient
+from pymongo import ASCENDING, DESCENDING, UpdateOne, monitoring
+from pymongo.errors import OperationFailure
 
 from config import Config
 
 from .logger import LOGS
+from .storage import Storage
 
 
-class Database(object):
+class QueryTimer(monitoring.CommandListener):
+    """Feeds the time of every command sent to mongo into the query stats."""
+
+    def __init__(self, stats):
+        self.stats = stats
+        self.running = {}  # request_id -> (command, collection)
+
+    def started(self, event):
+        coll = event.command.get(event.command_name)
+        # pymongo calls listeners from its own threads, dict ops are atomic
+        self.running[event.request_id] = (
+            event.command_name,
+            coll if isinstance(coll, str) else "-",
+        )
+
+    def _done(self, event):
+        key = self.running.pop(event.request_id, None)
+        if key is not None:
+            self.stats.record(*key, event.duration_micros / 1000)
+
+    def succeeded(self, event):
+        self._done(event)
+
+    def failed(self, event):
+        self._done(event)
+
+
+class Database(Storage):
+    """MongoDB backend."""
+
     def __init__(self):
-        self.client = AsyncIOMotorClient(Config.DATABASE_URL)
+        super().__init__()
+        self.client = AsyncIOMotorClient(
+            Config.DATABASE_URL, event_listeners=[QueryTimer(self.timer)]
+        )
         self.db = self.client["Yukki"]
 
         # mongo db collections
+        self.assistants = self.db.assistants
         self.authchats = self.db.authchats
         self.authusers = self.db.authusers
         self.autoend = self.db.autoend
@@ -25,12 +63,6 @@ class Database(object):
         self.sudousers = self.db.sudousers
         self.tgusersdb = self.db.tgusersdb
 
-        # local db collections
-        self.active_vc = [{"chat_id": 0, "join_time": 0, "vc_type": "voice"}]
-        self.inactive = {}
-        self.loop = {}
-        self.watcher = {}
-
     # database connection #
     async def connect(self):
         try:
@@ -39,27 +71,129 @@ class Database(object):
         except Exception as e:
             LOGS.error(f"\x44\x61\x74\x61\x62\x61\x73\x65\x20\x63\x6f\x6e\x6e\x65\x63\x74\x69\x6f\x6e\x20\x66\x61\x69\x6c\x65\x64\x3a\x20\x27{e}\x27")
             sys.exit()
+        if Config.DB_WATCH.lower() == "on":
+            asyncio.create_task(self.watch_settings())
+        # building indexes on a large collection can take a while, don't hold up the boot
+        asyncio.create_task(self.ensure_indexes())
+
+    async def _index_progress(self, coll: str, name: str, task):
+        while not task.done():
+            await asyncio.sleep(10)
+            if task.done():
+                break
+            try:
+                ops = await self.client.admin.command(
+                    {"currentOp": True, "command.createIndexes": coll}
+                )
+                for op in ops.get("inprog", []):
+                    progress = op.get("progress")
+                    if progress and progress.get("total"):
+                        done = progress["done"] * 100 / progress["total"]
+                        LOGS.info(f">> Building index {name} on {coll}: {done:.0f}%")
+                        break
+                else:
+                    LOGS.info(f">> Building index {name} on {coll} ...")
+            except Exception:
+                LOGS.info(f">> Building index {name} on {coll} ...")
+
+    async def _create_index(self, coll: str, keys: list, unique: bool):
+        name = "_".join(f"{k}_{d}" for k, d in keys)
+        start = time.time()
+        task = asyncio.ensure_future(
+            self.db[coll].create_index(keys, name=name, unique=unique, background=True)
+        )
+        progress = asyncio.create_task(self._index_progress(coll, name, task))
+        try:
+            await task
+        except OperationFailure as e:
+            if not unique:
+                raise
+            # old data can hold duplicates, a plain index still speeds up lookups
+            LOGS.warning(
+                f">> Unique index {name} on {coll} failed, using a plain one: {e}"
+            )
+            await self.db[coll].create_index(keys, name=f"{name}_plain", background=True)
+        finally:
+            progress.cancel()
+        took = time.time() - start
+        if took >= 1:
+            LOGS.info(f">> Index {name} on {coll} ready in {took:.2f}s")
+
+    async def ensure_indexes(self):
+        indexes = [
+            ("authusers", [("chat_id", ASCENDING), ("user_id", ASCENDING)], True),
+            ("chats", [("chat_id", ASCENDING)], True),
+            ("favorites", [("user_id", ASCENDING)], True),
+            ("tgusersdb", [("user_id", ASCENDING)], True),
+            ("tgusersdb", [("songs_played", DESCENDING)], False),
+        ]
+        start = time.time()
+        for coll, keys, unique in indexes:
+            try:
+                await self._create_index(coll, keys, unique)
+            except Exception as e:
+                LOGS.error(f">> Failed to create index on {coll}: {e}")
+        LOGS.info(f">> Database indexes checked in {time.time() - start:.2f}s")
+
+    async def watch_settings(self):
+        """Drop cached settings when another process changes them (mongo change streams)."""
+        watched = {  # collection -> cache key
+            "authchats": "authchats",
+            "authusers": None,
+            "autoend": "autoend",
+            "blocked_users": "blocked",
+            "gban_db": "gbanned",
+            "sudousers": "sudo",
+        }
+        pipeline = [{"$match": {"ns.coll": {"$in": list(watched)}}}]
+        while True:
+            try:
+                async with self.db.watch(pipeline) as stream:
+                    async for change in stream:
+                        key = watched[change["ns"]["coll"]]
+                        if key:
+                            self.invalidate(key)
+                        else:
+                            # deletes only carry the _id, drop every chat's auth users
+                            self.invalidate(
+                                *[x for x in self.cache if x[0] == "authusers"]
+                            )
+            except Exception as e:
+                LOGS.error(f">> Settings change stream failed: {e}")
+                # the stream may have missed changes while it was down
+                self.cache.clear()
+                await asyncio.sleep(30)
+
+    # assistants db #
+    async def get_assistant_sessions(self) -> list:
+        sessions = []
+        async for x in self.assistants.find({}):
+            sessions.append(x["session"])
+        return sessions
+
+    async def add_assistant_session(self, session: str):
+        await self.assistants.update_one(
+            {"session": session}, {"$set": {"session": session}}, upsert=True
+        )
+
+    async def remove_assistant_session(self, session: str):
+        await self.assistants.delete_one({"session": session})
 
     # users db #
-    async def add_user(self, user_id: int, user_name: str):
+    async def _insert_user(self, user_id: int, user_name: str, join_date: str):
         context = {
             "user_id": user_id,
             "user_name": user_name,
-            "join_date": datetime.datetime.now().strftime("%d-%m-%Y %H:%M"),
+            "join_date": join_date,
             "songs_played": 0,
         }
         await self.tgusersdb.insert_one(context)
 
-    async def delete_user(self, user_id: int):
+    async def _delete_user(self, user_id: int):
         await self.tgusersdb.delete_one({"user_id": user_id})
 
-    async def is_user_exist(self, user_id: int) -> bool:
-        user = await self.tgusersdb.find_one({"user_id": user_id})
-        return bool(user)
-
-    async def get_user(self, user_id: int):
-        user = await self.tgusersdb.find_one({"user_id": user_id})
-        return user
+    async def _find_user(self, user_id: int):
+        return await self.tgusersdb.find_one({"user_id": user_id})
 
     async def get_all_users(self):
         users = self.tgusersdb.find({})
@@ -69,33 +203,77 @@ class Database(object):
         count = await self.tgusersdb.count_documents({})
         return count
 
-    async def update_user(self, user_id: int, key: str, value):
-        if key == "songs_played":
-            prev = await self.tgusersdb.find_one({"user_id": user_id}) or {}
-            current = prev.get("songs_played", 0)
-            value = current + value
+    async def top_users(self, limit: int = 10, user_ids: list = None) -> list:
+        query = {"user_id": {"$in": user_ids}} if user_ids else {}
+        fields = {"_id": 0, "user_id": 1, "user_name": 1, "first_name": 1, "name": 1, "songs_played": 1}
+        cursor = self.tgusersdb.find(query, fields).sort("songs_played", DESCENDING)
+        return await cursor.limit(limit).to_list(length=limit)
 
+    async def update_user(self, user_id: int, key: str, value):
+        # songs_played is a counter, increment it in place
+        update = {"$inc": {key: value}} if key == "songs_played" else {"$set": {key: value}}
         await self.tgusersdb.update_one(
             {"user_id": user_id},
-            {"$set": {key: value}},
+            update,
             upsert=True,  # optional, but helpful so doc always exists
+        )
+
+    async def _write_users(self, users: dict, renamed: dict):
+        ops = [
+            UpdateOne(
+                {"user_id": user_id},
+                {
+                    "$set": {"user_name": x["user_name"]},
+                    "$setOnInsert": {"join_date": x["join_date"], "songs_played": 0},
+                },
+                upsert=True,
             )
-        
+            for user_id, x in users.items()
+        ]
+        ops += [
+            UpdateOne({"user_id": user_id}, {"$set": {"user_name": name}})
+            for user_id, name in renamed.items()
+        ]
+        await self.tgusersdb.bulk_write(ops, ordered=False)
+
+    async def _write_play_counts(self, users: dict):
+        joined = datetime.datetime.now().strftime("%d-%m-%Y %H:%M")
+        await self.tgusersdb.bulk_write(
+            [
+                UpdateOne(
+                    {"user_id": user_id},
+                    {
+                        "$inc": {"songs_played": count},
+                        "$setOnInsert": {"join_date": joined},
+                    },
+                    upsert=True,
+                )
+                for user_id, count in users.items()
+            ],
+            ordered=False,
+        )
+
+    async def _peer_ids(self) -> tuple:
+        users, chats = set(), set()
+        async for x in self.tgusersdb.find({}, {"user_id": 1, "_id": 0}):
+            if "user_id" in x:
+                users.add(x["user_id"])
+        async for x in self.chats.find({}, {"chat_id": 1, "_id": 0}):
+            if "chat_id" in x:
+                chats.add(x["chat_id"])
+        return users, chats
+
     # chat db #
-    async def add_chat(self, chat_id: int):
+    async def _insert_chat(self, chat_id: int, join_date: datetime.datetime):
         context = {
             "chat_id": chat_id,
-            "join_date": datetime.datetime.now(),
+            "join_date": join_date,
         }
         await self.chats.insert_one(context)
 
-    async def delete_chat(self, chat_id: int):
+    async def _delete_chat(self, chat_id: int):
         await self.chats.delete_one({"chat_id": chat_id})
 
-    async def is_chat_exist(self, chat_id: int) -> bool:
-        chat = await self.chats.find_one({"chat_id": chat_id})
-        return bool(chat)
-
     async def get_chat(self, chat_id: int):
         chat = await self.chats.find_one({"chat_id": chat_id})
         return chat
@@ -108,258 +286,132 @@ class Database(object):
         count = await self.chats.count_documents({})
         return count
 
-    # active vc db #
-    async def get_active_vc(self) -> list:
-        return self.active_vc
-
-    async def add_active_vc(self, chat_id: int, vc_type: str):
-        cid = [x["chat_id"] for x in self.active_vc]
-        if not chat_id in cid:
-            self.active_vc.append(
-                {
-                    "chat_id": chat_id,
-                    "join_time": datetime.datetime.now(),
-                    "vc_type": vc_type,
-                }
-            )
-
-    async def is_active_vc(self, chat_id: int) -> bool:
-        cid = [x["chat_id"] for x in self.active_vc]
-        if chat_id not in cid:
-            return False
-        else:
-            return True
-
-    async def remove_active_vc(self, chat_id: int):
-        for x in self.active_vc:
-            if x["chat_id"] == chat_id:
-                self.active_vc.remove(x)
-
-    async def total_actvc_count(self) -> int:
-        count = self.active_vc
-        return len(count) - 1
+    async def _write_chats(self, chats: dict):
+        await self.chats.bulk_write(
+            [
+                UpdateOne({"chat_id": chat_id}, {"$setOnInsert": x}, upsert=True)
+                for chat_id, x in chats.items()
+            ],
+            ordered=False,
+        )
 
     # autoend db #
-    async def get_autoend(self) -> bool:
-        try:
-            autoend = await self.autoend.find_one({"autoend": "on"})
-            if autoend:
-                return True
-            else:
-                return False
-        except:
-            return False
-
-    async def set_autoend(self, autoend: bool):
-        _db = await self.autoend.find_one({"autoend": "on"})
-        if autoend is True:
-            if _db:
-                return
-            await self.autoend.insert_one({"autoend": "on"})
+    async def _load_autoend(self) -> bool:
+        autoend = await self.autoend.find_one({"autoend": "on"})
+        return bool(autoend)
+
+    async def _write_autoend(self, autoend: bool):
+        if autoend:
+            await self.autoend.update_one(
+                {"autoend": "on"}, {"$set": {"autoend": "on"}}, upsert=True
+            )
         else:
             await self.autoend.delete_one({"autoend": "on"})
 
-    # loop db #
-    async def set_loop(self, chat_id: int, loop: int):
-        self.loop[chat_id] = loop
-
-    async def get_loop(self, chat_id: int) -> int:
-        loop = self.loop.get(chat_id)
-        return loop or 0
-
-    # watcher db #
-    async def set_watcher(self, chat_id: int, key: str, watch: bool):
-        self.watcher[chat_id] = {key: watch}
-
-    async def get_watcher(self, chat_id: int, key: str) -> bool:
-        try:
-            watch = self.watcher[chat_id][key]
-        except KeyError:
-            watch = False
-        return watch
-
-    # sudousers db #
-    async def get_sudo_users(self) -> list:
-        users = await self.sudousers.find_one({"sudo": "sudo"})
-        if not users:
-            return []
-        return users["user_ids"]
-
-    async def add_sudo(self, user_id: int) -> bool:
-        users = await self.get_sudo_users()
-        users.append(user_id)
-        await self.sudousers.update_one(
-            {"sudo": "sudo"}, {"$set": {"user_ids": users}}, upsert=True
-        )
-        return True
-
-    async def remove_sudo(self, user_id: int) -> bool:
-        users = await self.get_sudo_users()
-        users.remove(user_id)
-        await self.sudousers.update_one(
-            {"sudo": "sudo"}, {"$set": {"user_ids": users}}, upsert=True
-        )
-        return True
-
-    # blocked users db #
-    async def get_blocked_users(self) -> list:
-        users = await self.blocked_users.find_one({"blocked": "blocked"})
-        if not users:
-            return []
-        return users["user_ids"]
-
-    async def add_blocked_user(self, user_id: int) -> bool:
-        users = await self.get_blocked_users()
-        users.append(user_id)
-        await self.blocked_users.update_one(
-            {"blocked": "blocked"}, {"$set": {"user_ids": users}}, upsert=True
-        )
-        return True
-
-    async def remove_blocked_user(self, user_id: int) -> bool:
-        users = await self.get_blocked_users()
-        users.remove(user_id)
-        await self.blocked_users.update_one(
-            {"blocked": "blocked"}, {"$set": {"user_ids": users}}, upsert=True
-        )
-        return True
-
-    async def total_block_count(self) -> int:
-        count = await self.get_blocked_users()
-        return len(count)
-
-    # gbanned users db #
-    async def get_gbanned_users(self) -> list:
-        users = await self.gban_db.find_one({"gbanned": "gbanned"})
-        if not users:
-            return []
-        return users["user_ids"]
-
-    async def add_gbanned_user(self, user_id: int) -> bool:
-        users = await self.get_gbanned_users()
-        users.append(user_id)
-        await self.gban_db.update_one(
-            {"gbanned": "gbanned"}, {"$set": {"user_ids": users}}, upsert=True
-        )
-        return True
-
-    async def remove_gbanned_users(self, user_id: int) -> bool:
-        users = await self.get_gbanned_users()
-        users.remove(user_id)
-        await self.gban_db.update_one(
-            {"gbanned": "gbanned"}, {"$set": {"user_ids": users}}, upsert=True
-        )
-        return True
-
-    async def is_gbanned_user(self, user_id: int) -> bool:
-        users = await self.gban_db.find_one({"gbanned": "gbanned"})
-        if users and user_id in users["user_ids"]:
-            return True
-        else:
-            return False
-
-    async def total_gbans_count(self) -> int:
-        count = await self.get_gbanned_users()
-        return len(count)
+    # id lists #
+    def _id_list(self, name: str) -> tuple:
+        # list name -> (collection, document filter, array field)
+        return {
+            "authchats": (self.authchats, {"authchats": "authchats"}, "chat_ids"),
+            "blocked": (self.blocked_users, {"blocked": "blocked"}, "user_ids"),
+            "gbanned": (self.gban_db, {"gbanned": "gbanned"}, "user_ids"),
+            "sudo": (self.sudousers, {"sudo": "sudo"}, "user_ids"),
+        }[name]
+
+    async def _load_ids(self, name: str) -> set:
+        coll, query, field = self._id_list(name)
+        doc = await coll.find_one(query, {field: 1, "_id": 0})
+        return set(doc.get(field, [])) if doc else set()
+
+    async def _push_id(self, name: str, value: int):
+        coll, query, field = self._id_list(name)
+        await coll.update_one(query, {"$addToSet": {field: value}}, upsert=True)
+
+    async def _pull_id(self, name: str, value: int):
+        coll, query, field = self._id_list(name)
+        await coll.update_one(query, {"$pull": {field: value}})
 
     # authusers db #
-    async def add_authusers(self, chat_id: int, user_id: int, details: dict):
+    async def _load_authusers(self, chat_id: int) -> dict:
+        users = {}
+        fields = {"_id": 0, "user_id": 1, "details": 1}
+        async for x in self.authusers.find({"chat_id": chat_id}, fields):
+            users[x["user_id"]] = x["details"]
+        return users
+
+    async def _insert_authuser(self, chat_id: int, user_id: int, details: dict):
         await self.authusers.insert_one(
             {"chat_id": chat_id, "user_id": user_id, "details": details}
         )
 
-    async def is_authuser(self, chat_id: int, user_id: int) -> bool:
-        chat = await self.authusers.find_one({"chat_id": chat_id, "user_id": user_id})
-        return bool(chat)
-
-    async def get_authuser(self, chat_id: int, user_id: int):
-        chat = await self.authusers.find_one({"chat_id": chat_id, "user_id": user_id})
-        return chat["details"] if chat else {}
-
-    async def get_all_authusers(self, chat_id: int) -> list:
-        all_users = []
-        users = self.authusers.find({"chat_id": chat_id})
-        async for user in users:
-            all_users.append(user["user_id"])
-        return all_users if all_users else []
-
-    async def remove_authuser(self, chat_id: int, user_id: int):
+    async def _delete_authuser(self, chat_id: int, user_id: int):
         await self.authusers.delete_one({"chat_id": chat_id, "user_id": user_id})
 
-    # authchats db #
-    async def get_authchats(self) -> list:
-        chats = await self.authchats.find_one({"authchats": "authchats"})
-        if not chats:
-            return []
-        return chats["chat_ids"]
-
-    async def add_authchat(self, chat_id: int) -> bool:
-        chats = await self.get_authchats()
-        chats.append(chat_id)
-        await self.authchats.update_one(
-            {"authchats": "authchats"}, {"$set": {"chat_ids": chats}}, upsert=True
-        )
-        return True
-
-    async def remove_authchat(self, chat_id: int) -> bool:
-        chats = await self.get_authchats()
-        chats.remove(chat_id)
-        await self.authchats.update_one(
-            {"authchats": "authchats"}, {"$set": {"chat_ids": chats}}, upsert=True
-        )
-        return True
-
-    async def is_authchat(self, chat_id: int) -> bool:
-        chats = await self.authchats.find_one({"authchats": "authchats"})
-        if chats and chat_id in chats["chat_ids"]:
-            return True
-        return False
-
     # favorites db #
     async def get_favs(self, user_id: int) -> dict:
         favs = await self.favorites.find_one({"user_id": user_id})
         return favs["tracks"] if favs else {}
 
     async def add_favorites(self, user_id: int, video_id: str, context: dict):
-        favs = await self.get_favs(user_id)
-        favs[video_id] = context
         await self.favorites.update_one(
-            {"user_id": user_id}, {"$set": {"tracks": favs}}, upsert=True
+            {"user_id": user_id}, {"$set": {f"tracks.{video_id}": context}}, upsert=True
         )
 
     async def rem_favorites(self, user_id: int, video_id: str) -> bool:
-        favs = await self.get_favs(user_id)
-        if video_id in favs:
-            del favs[video_id]
-            await self.favorites.update_one(
-                {"user_id": user_id}, {"$set": {"tracks": favs}}, upsert=True
-            )
-            return True
-        return False
+        result = await self.favorites.update_one(
+            {"user_id": user_id, f"tracks.{video_id}": {"$exists": True}},
+            {"$unset": {f"tracks.{video_id}": ""}},
+        )
+        return result.modified_count > 0
 
-    async def get_all_favorites(self, user_id: int) -> list:
-        favs = []
-        for x in await self.get_favs(user_id):
-            favs.append(x)
-        return favs
+    async def clear_favorites(self, user_id: int):
+        await self.favorites.update_one({"user_id": user_id}, {"$set": {"tracks": {}}})
 
-    async def get_favorite(self, user_id: int, video_id: str) -> dict:
-        favs = await self.get_favs(user_id)
-        return favs[video_id] if video_id in favs else {}
+    async def get_all_favorites(self, user_id: int) -> list:
+        # only the video ids, not the track details
+        cursor = self.favorites.aggregate(
+            [
+                {"$match": {"user_id": user_id}},
+                {
+                    "$project": {
+                        "_id": 0,
+                        "ids": {
+                            "$map": {
+                                "input": {"$objectToArray": "$tracks"},
+                                "in": "$$this.k",
+                            }
+                        },
+                    }
+                },
+            ]
+        )
+        async for x in cursor:
+            return x["ids"]
+        return []
+
+    async def get_favorites(self, user_id: int, video_ids: list) -> dict:
+        if not video_ids:
+            # an empty projection would return every track
+            return {}
+        fields = {f"tracks.{x}": 1 for x in video_ids}
+        fields["_id"] = 0
+        favs = await self.favorites.find_one({"user_id": user_id}, fields)
+        return favs.get("tracks", {}) if favs else {}
 
     # songs db #
-    async def total_songs_count(self) -> int:
+    async def _songs_count(self) -> int:
         count = await self.songsdb.find_one({"songs": "songs"})
-        if count:
-            return count["count"]
-        return 0
+        return count["count"] if count else 0
 
     async def update_songs_count(self, count: int):
-        songs = await self.total_songs_count()
-        songs = songs + count
         await self.songsdb.update_one(
-            {"songs": "songs"}, {"$set": {"count": songs}}, upsert=True
+            {"songs": "songs"}, {"$inc": {"count": count}}, upsert=True
         )
 
 
-db = Database()
+if (Config.DATABASE_URL or "").startswith("sqlite"):
+    from .sqlite import SQLiteDatabase
+
+    db = SQLiteDatabase(Config.DATABASE_URL)
+else:
+    db = Database()
@@ -17,6 +17,5 @@ logging.basicConfig(
 logging.getLogger("pyrogram").setLevel(logging.ERROR)
 logging.getLogger("pytgcalls").setLevel(logging.ERROR)
 logging.getLogger("asyncio").setLevel(logging.ERROR)
-logging.getLogger("apscheduler").setLevel(logging.ERROR)
 
 LOGS = logging.getLogger("HellMusic")
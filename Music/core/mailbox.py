@@ -0,0 +1,90 @@
+import asyncio
+
+from .logger import LOGS
+
+
+class ChatMailbox:
+    """
+    Per chat command mailbox for playback state transitions.
+    - Transitions of one chat run one at a time (in submit order)
+    - Same action posted while one is pending/running is coalesced into it
+    - An action can supersede (drop) pending actions of other kinds
+    """
+
+    def __init__(self):
+        self.locks = {}
+        self.inflight = {}
+        self.running = set()
+        self.coalesced = 0
+
+    def _lock(self, chat_id: int) -> asyncio.Lock:
+        lock = self.locks.get(chat_id)
+        if lock is None:
+            lock = asyncio.Lock()
+            self.locks[chat_id] = lock
+        return lock
+
+    def _release(self, chat_id: int, key: tuple, task: asyncio.Task):
+        if self.inflight.get(key) is task:
+            self.inflight.pop(key, None)
+        if not any(k[0] == chat_id for k in self.inflight):
+            lock = self.locks.get(chat_id)
+            if lock and not lock.locked():
+                self.locks.pop(chat_id, None)
+
+    async def _run(self, chat_id: int, key: tuple, func, *args, **kwargs):
+        async with self._lock(chat_id):
+            self.running.add(key)
+            try:
+                return await func(*args, **kwargs)
+            finally:
+                self.running.discard(key)
+
+    def _supersede(self, chat_id: int, actions: tuple):
+        for action in actions:
+            key = (chat_id, action)
+            task = self.inflight.get(key)
+            if task and not task.done() and key not in self.running:
+                task.cancel()
+                self.inflight.pop(key, None)
+
+    async def post(
+        self,
+        chat_id: int,
+        action: str,
+        func,
+        *args,
+        coalesce: bool = True,
+        supersedes: tuple = (),
+        **kwargs,
+    ):
+        key = (chat_id, action)
+        if coalesce:
+            task = self.inflight.get(key)
+            if task and not task.done():
+                self.coalesced += 1
+                return await self._wait(task)
+        else:
+            key = (chat_id, action, object())
+
+        self._supersede(chat_id, supersedes)
+        task = asyncio.ensure_future(self._run(chat_id, key, func, *args, **kwargs))
+        task.add_done_callback(lambda t: self._release(chat_id, key, t))
+        self.inflight[key] = task
+        return await self._wait(task)
+
+    async def _wait(self, task: asyncio.Task):
+        try:
+            return await asyncio.shield(task)
+        except asyncio.CancelledError:
+            if task.cancelled():
+                LOGS.info(">> Mailbox: dropped a superseded transition.")
+                return None
+            raise
+
+    def is_busy(self, chat_id: int) -> bool:
+        lock = self.locks.get(chat_id)
+        return bool(lock and lock.locked())
+
+
+mailbox = ChatMailbox()
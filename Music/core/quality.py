@@ -0,0 +1,80 @@
+from pytgcalls.types.input_stream.quality import (
+    HighQualityAudio,
+    HighQualityVideo,
+    LowQualityAudio,
+    LowQualityVideo,
+    MediumQualityAudio,
+    MediumQualityVideo,
+)
+
+from config import Config
+
+from .cpu import CPUSampler
+
+
+PROFILES = {
+    "high": (HighQualityAudio, HighQualityVideo),
+    "medium": (MediumQualityAudio, MediumQualityVideo),
+    "low": (LowQualityAudio, LowQualityVideo),
+}
+LEVELS = ["high", "medium", "low"]
+
+
+class QualityController:
+    """
+    Stream quality profiles per chat (falls back to the global one) and a
+    CPU-aware downgrade step shared by all video streams:
+    - step 1: video one profile lower
+    - step 2: video two profiles lower
+    - step 3: video chats stream audio only
+    """
+
+    def __init__(self):
+        self.default = Config.STREAM_QUALITY if Config.STREAM_QUALITY in PROFILES else "medium"
+        self.chats = {}  # chat_id -> profile name
+        self.step = 0
+        self.calm = 0  # consecutive samples below CPU_LOW
+        self.cpu = CPUSampler()
+
+    def get(self, chat_id: int) -> str:
+        return self.chats.get(chat_id, self.default)
+
+    def set(self, chat_id: int, profile: str):
+        if profile == "default":
+            self.chats.pop(chat_id, None)
+        else:
+            self.chats[chat_id] = profile
+
+    def set_default(self, profile: str):
+        self.default = profile
+
+    def effective(self, chat_id: int, video: bool) -> tuple:
+        """(audio quality, video quality or None for audio only)"""
+        profile = LEVELS.index(self.get(chat_id))
+        audio = PROFILES[LEVELS[profile]][0]()
+        if not video:
+            return audio, None
+        if self.step >= 3:
+            return audio, None
+        lowered = min(profile + self.step, len(LEVELS) - 1)
+        return audio, PROFILES[LEVELS[lowered]][1]()
+
+    def sample(self) -> bool:
+        """Check host CPU and move the downgrade step; True if it changed."""
+        if not Config.CPU_HIGH:
+            return False
+        cpu = self.cpu.percent()
+        if cpu >= Config.CPU_HIGH and self.step < 3:
+            self.step += 1
+            self.calm = 0
+            return True
+        if cpu <= Config.CPU_LOW and self.step > 0:
+            self.calm += 1
+            # step back up slowly, a single quiet sample is not enough
+            if self.calm >= 3:
+                self.step -= 1
+                self.calm = 0
+                return True
+        else:
+            self.calm = 0
+        return False
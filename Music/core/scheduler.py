@@ -0,0 +1,95 @@
+import time
+from collections import deque
+
+from config import Config
+
+
+class AssistantScheduler:
+    """
+    Places chats on assistants by live load instead of round robin.
+    load = voice streams + video streams * video weight + recent errors * error weight
+    """
+
+    def __init__(self):
+        self.streams = {}  # assistant index -> {chat_id: vc_type}
+        self.errors = {}  # assistant index -> deque of error timestamps
+        self.flood_until = {}  # assistant index -> unix time when FloodWait ends
+        self.avoided = {}  # chat_id -> {assistant index: unix time until avoided}
+
+    def _recent_errors(self, index: int) -> int:
+        errors = self.errors.get(index)
+        if not errors:
+            return 0
+        cutoff = time.time() - Config.ASSISTANT_ERROR_WINDOW
+        while errors and errors[0] < cutoff:
+            errors.popleft()
+        return len(errors)
+
+    def is_flooded(self, index: int) -> bool:
+        return self.flood_until.get(index, 0) > time.time()
+
+    def is_avoided(self, chat_id: int, index: int) -> bool:
+        return self.avoided.get(chat_id, {}).get(index, 0) > time.time()
+
+    def avoid(self, chat_id: int, index: int):
+        # assistant is banned / rate-limited in this chat
+        self.avoided.setdefault(chat_id, {})[index] = (
+            time.time() + Config.ASSISTANT_ERROR_WINDOW
+        )
+
+    def load(self, index: int) -> int:
+        streams = self.streams.get(index, {})
+        video = sum(1 for x in streams.values() if x == "video")
+        voice = len(streams) - video
+        return (
+            voice
+            + video * Config.ASSISTANT_VIDEO_WEIGHT
+            + self._recent_errors(index) * Config.ASSISTANT_ERROR_WEIGHT
+        )
+
+    def pick(self, chat_id: int, indexes: list, present: set = ()) -> int:
+        """present: assistants known to be members of the chat already."""
+        if not indexes:
+            return None
+        usable = [i for i in indexes if not self.is_avoided(chat_id, i)] or list(indexes)
+        usable = [i for i in usable if not self.is_flooded(i)] or usable
+        best = min(usable, key=lambda i: (self.load(i), i))
+        members = [i for i in usable if i in present]
+        # prefer an assistant already in the chat unless it is clearly busier
+        if members:
+            sticky = min(members, key=lambda i: (self.load(i), i))
+            if self.load(sticky) <= self.load(best) + 1:
+                return sticky
+        return best
+
+    def attach(self, index: int, chat_id: int, vc_type: str):
+        for streams in self.streams.values():
+            streams.pop(chat_id, None)
+        self.streams.setdefault(index, {})[chat_id] = vc_type
+
+    def release(self, chat_id: int):
+        for streams in self.streams.values():
+            streams.pop(chat_id, None)
+
+    def forget(self, index: int):
+        self.streams.pop(index, None)
+        self.errors.pop(index, None)
+        self.flood_until.pop(index, None)
+        for avoided in self.avoided.values():
+            avoided.pop(index, None)
+
+    def record_error(self, index: int, wait: int = 0):
+        self.errors.setdefault(index, deque()).append(time.time())
+        if wait:
+            self.flood_until[index] = time.time() + int(wait)
+
+    def stats(self, index: int) -> dict:
+        streams = self.streams.get(index, {})
+        video = sum(1 for x in streams.values() if x == "video")
+        return {
+            "streams": len(streams),
+            "video": video,
+            "errors": self._recent_errors(index),
+            "flooded": self.is_flooded(index),
+            "load": self.load(index),
+        }
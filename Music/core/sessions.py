@@ -0,0 +1,93 @@
+import asyncio
+import datetime
+
+from .logger import LOGS
+
+
+class ActiveSessions:
+    """
+    Voice chats being streamed, keyed by chat id.
+    - secondary indexes by assistant and vc_type keep lookups and counts O(1)
+    - subscribers are called with ("start" | "update" | "end", session) after
+      every change, coroutine functions are scheduled as tasks
+    """
+
+    def __init__(self):
+        self.chats = {}  # chat_id -> {"chat_id", "join_time", "vc_type", "assistant"}
+        self.by_assistant = {}  # assistant index -> {chat_id}
+        self.by_type = {"voice": set(), "video": set()}
+        self.subscribers = []
+
+    def __contains__(self, chat_id) -> bool:
+        return chat_id in self.chats
+
+    def __len__(self) -> int:
+        return len(self.chats)
+
+    def __iter__(self):
+        return iter(list(self.chats.values()))
+
+    def subscribe(self, func):
+        self.subscribers.append(func)
+
+    def _emit(self, event: str, session: dict):
+        for func in self.subscribers:
+            try:
+                result = func(event, session)
+                if asyncio.iscoroutine(result):
+                    asyncio.ensure_future(result)
+            except Exception as e:
+                LOGS.error(f">> Session subscriber failed on {event}: {e}")
+
+    def _unindex(self, session: dict):
+        self.by_type.get(session["vc_type"], set()).discard(session["chat_id"])
+        chats = self.by_assistant.get(session["assistant"])
+        if chats is not None:
+            chats.discard(session["chat_id"])
+            if not chats:
+                self.by_assistant.pop(session["assistant"], None)
+
+    def _index(self, session: dict):
+        self.by_type.setdefault(session["vc_type"], set()).add(session["chat_id"])
+        self.by_assistant.setdefault(session["assistant"], set()).add(session["chat_id"])
+
+    def add(self, chat_id: int, vc_type: str, assistant: int = None) -> dict:
+        """Start a session, or update the type / assistant of a running one."""
+        session = self.chats.get(chat_id)
+        if session is None:
+            session = {
+                "chat_id": chat_id,
+                "join_time": datetime.datetime.now(),
+                "vc_type": vc_type,
+                "assistant": assistant,
+            }
+            self.chats[chat_id] = session
+            self._index(session)
+            self._emit("start", session)
+        elif (session["vc_type"], session["assistant"]) != (vc_type, assistant):
+            self._unindex(session)
+            session["vc_type"] = vc_type
+            session["assistant"] = assistant
+            self._index(session)
+            self._emit("update", session)
+        return session
+
+    def remove(self, chat_id: int):
+        session = self.chats.pop(chat_id, None)
+        if session is not None:
+            self._unindex(session)
+            self._emit("end", session)
+
+    def get(self, chat_id: int) -> dict:
+        return self.chats.get(chat_id)
+
+    def of_assistant(self, assistant: int) -> set:
+        return set(self.by_assistant.get(assistant, ()))
+
+    def of_type(self, vc_type: str) -> set:
+        return set(self.by_type.get(vc_type, ()))
+
+    def count(self, vc_type: str = None) -> int:
+        if vc_type is None:
+            return len(self.chats)
+        return len(self.by_type.get(vc_type, ()))
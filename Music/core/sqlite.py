@@ -0,0 +1,322 @@
+import asyncio
+import datetime
+import json
+import sqlite3
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from .logger import LOGS
+from .storage import Storage
+
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS assistants (session TEXT PRIMARY KEY);
+CREATE TABLE IF NOT EXISTS users (
+    user_id INTEGER PRIMARY KEY,
+    user_name TEXT,
+    join_date TEXT,
+    songs_played INTEGER NOT NULL DEFAULT 0
+);
+CREATE INDEX IF NOT EXISTS users_songs_played ON users (songs_played DESC);
+CREATE TABLE IF NOT EXISTS chats (chat_id INTEGER PRIMARY KEY, join_date TEXT);
+CREATE TABLE IF NOT EXISTS id_lists (
+    name TEXT NOT NULL,
+    value INTEGER NOT NULL,
+    PRIMARY KEY (name, value)
+);
+CREATE TABLE IF NOT EXISTS authusers (
+    chat_id INTEGER NOT NULL,
+    user_id INTEGER NOT NULL,
+    details TEXT NOT NULL,
+    PRIMARY KEY (chat_id, user_id)
+);
+CREATE TABLE IF NOT EXISTS favorites (
+    user_id INTEGER NOT NULL,
+    video_id TEXT NOT NULL,
+    details TEXT NOT NULL,
+    PRIMARY KEY (user_id, video_id)
+);
+CREATE TABLE IF NOT EXISTS settings (key TEXT PRIMARY KEY, value TEXT);
+"""
+
+
+class SQLiteDatabase(Storage):
+    """
+    Embedded SQLite backend for single node deployments and offline runs.
+    - DATABASE_URL is sqlite:///relative/path.db or sqlite:////absolute/path.db
+    - every query runs on one worker thread that owns the connection, so the
+      event loop never blocks and writes never interleave
+    - documents keep the shape the mongo backend returns
+    """
+
+    def __init__(self, url: str):
+        super().__init__()
+        path = url.split("://", 1)[1]
+        self.path = path[1:] if path.startswith("/") else path
+        self.conn = None
+        self.executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="sqlite")
+
+    # query helpers #
+    def _execute(self, sql: str, params=(), many: bool = False) -> sqlite3.Cursor:
+        start = time.perf_counter()
+        cursor = (self.conn.executemany if many else self.conn.execute)(sql, params)
+        words = sql.split()
+        table = next(
+            (words[i + 1] for i, x in enumerate(words[:-1]) if x.upper() in ("FROM", "INTO", "UPDATE")),
+            "-",
+        )
+        self.timer.record(words[0].lower(), table, (time.perf_counter() - start) * 1000)
+        return cursor
+
+    async def _run(self, func, *args):
+        return await asyncio.get_running_loop().run_in_executor(self.executor, func, *args)
+
+    async def _fetchone(self, sql: str, params=()):
+        return await self._run(lambda: self._execute(sql, params).fetchone())
+
+    async def _fetchall(self, sql: str, params=()) -> list:
+        return await self._run(lambda: self._execute(sql, params).fetchall())
+
+    async def _write(self, sql: str, params=(), many: bool = False) -> int:
+        def write():
+            with self.conn:
+                return self._execute(sql, params, many).rowcount
+
+        return await self._run(write)
+
+    async def _rows(self, sql: str, size: int = 1000):
+        # pages by rowid so a broadcast over every row never loads the whole table
+        last = -(2**63)  # chat ids are negative, and they are the rowid of chats
+        while True:
+            rows = await self._fetchall(
+                f"{sql} WHERE rowid > ? ORDER BY rowid LIMIT {size}", (last,)
+            )
+            for row in rows:
+                last = row["_rowid"]
+                yield {k: row[k] for k in row.keys() if k != "_rowid"}
+            if len(rows) < size:
+                return
+
+    # database connection #
+    async def connect(self):
+        def open_db():
+            self.conn = sqlite3.connect(self.path)
+            self.conn.row_factory = sqlite3.Row
+            self.conn.execute("PRAGMA journal_mode=WAL")
+            self.conn.execute("PRAGMA synchronous=NORMAL")
+            self.conn.executescript(SCHEMA)
+
+        try:
+            await self._run(open_db)
+            LOGS.info(f">> SQLite database {self.path} ready!")
+        except Exception as e:
+            LOGS.error(f"Database connection failed: '{e}'")
+            sys.exit()
+
+    # assistants db #
+    async def get_assistant_sessions(self) -> list:
+        rows = await self._fetchall("SELECT session FROM assistants")
+        return [x["session"] for x in rows]
+
+    async def add_assistant_session(self, session: str):
+        await self._write("INSERT OR IGNORE INTO assistants VALUES (?)", (session,))
+
+    async def remove_assistant_session(self, session: str):
+        await self._write("DELETE FROM assistants WHERE session = ?", (session,))
+
+    # users db #
+    async def _insert_user(self, user_id: int, user_name: str, join_date: str):
+        await self._write(
+            "INSERT INTO users (user_id, user_name, join_date) VALUES (?, ?, ?)",
+            (user_id, user_name, join_date),
+        )
+
+    async def _delete_user(self, user_id: int):
+        await self._write("DELETE FROM users WHERE user_id = ?", (user_id,))
+
+    async def _find_user(self, user_id: int):
+        row = await self._fetchone("SELECT * FROM users WHERE user_id = ?", (user_id,))
+        return dict(row) if row else None
+
+    async def get_all_users(self):
+        return self._rows("SELECT rowid AS _rowid, * FROM users")
+
+    async def total_users_count(self) -> int:
+        return (await self._fetchone("SELECT COUNT(*) FROM users"))[0]
+
+    async def top_users(self, limit: int = 10, user_ids: list = None) -> list:
+        if user_ids:
+            marks = ",".join("?" * len(user_ids))
+            rows = await self._fetchall(
+                f"SELECT * FROM users WHERE user_id IN ({marks}) "
+                "ORDER BY songs_played DESC LIMIT ?",
+                (*user_ids, limit),
+            )
+        else:
+            rows = await self._fetchall(
+                "SELECT * FROM users ORDER BY songs_played DESC LIMIT ?", (limit,)
+            )
+        return [dict(x) for x in rows]
+
+    async def update_user(self, user_id: int, key: str, value):
+        if key not in ("user_name", "join_date", "songs_played"):
+            raise KeyError(key)
+        # songs_played is a counter, increment it in place
+        change = f"{key} = {key} + excluded.{key}" if key == "songs_played" else f"{key} = excluded.{key}"
+        await self._write(
+            f"INSERT INTO users (user_id, {key}) VALUES (?, ?) "
+            f"ON CONFLICT (user_id) DO UPDATE SET {change}",
+            (user_id, value),
+        )
+
+    async def _write_users(self, users: dict, renamed: dict):
+        def write():
+            with self.conn:
+                self._execute(
+                    "INSERT INTO users (user_id, user_name, join_date) VALUES (?, ?, ?) "
+                    "ON CONFLICT (user_id) DO UPDATE SET user_name = excluded.user_name",
+                    [(k, x["user_name"], x["join_date"]) for k, x in users.items()],
+                    many=True,
+                )
+                self._execute(
+                    "UPDATE users SET user_name = ? WHERE user_id = ?",
+                    [(name, k) for k, name in renamed.items()],
+                    many=True,
+                )
+
+        await self._run(write)
+
+    async def _write_play_counts(self, users: dict):
+        joined = datetime.datetime.now().strftime("%d-%m-%Y %H:%M")
+        await self._write(
+            "INSERT INTO users (user_id, join_date, songs_played) VALUES (?, ?, ?) "
+            "ON CONFLICT (user_id) DO UPDATE SET songs_played = songs_played + excluded.songs_played",
+            [(k, joined, count) for k, count in users.items()],
+            many=True,
+        )
+
+    async def _peer_ids(self) -> tuple:
+        users = await self._fetchall("SELECT user_id FROM users")
+        chats = await self._fetchall("SELECT chat_id FROM chats")
+        return {x[0] for x in users}, {x[0] for x in chats}
+
+    # chat db #
+    async def _insert_chat(self, chat_id: int, join_date: datetime.datetime):
+        await self._write(
+            "INSERT INTO chats VALUES (?, ?)", (chat_id, join_date.isoformat())
+        )
+
+    async def _delete_chat(self, chat_id: int):
+        await self._write("DELETE FROM chats WHERE chat_id = ?", (chat_id,))
+
+    async def get_chat(self, chat_id: int):
+        row = await self._fetchone("SELECT * FROM chats WHERE chat_id = ?", (chat_id,))
+        return dict(row) if row else None
+
+    async def get_all_chats(self):
+        return self._rows("SELECT rowid AS _rowid, * FROM chats")
+
+    async def total_chats_count(self) -> int:
+        return (await self._fetchone("SELECT COUNT(*) FROM chats"))[0]
+
+    async def _write_chats(self, chats: dict):
+        await self._write(
+            "INSERT OR IGNORE INTO chats VALUES (?, ?)",
+            [(k, x["join_date"].isoformat()) for k, x in chats.items()],
+            many=True,
+        )
+
+    # autoend db #
+    async def _load_autoend(self) -> bool:
+        row = await self._fetchone("SELECT value FROM settings WHERE key = 'autoend'")
+        return bool(row and row[0] == "on")
+
+    async def _write_autoend(self, autoend: bool):
+        await self._write(
+            "INSERT OR REPLACE INTO settings VALUES ('autoend', ?)",
+            ("on" if autoend else "off",),
+        )
+
+    # id lists #
+    async def _load_ids(self, name: str) -> set:
+        rows = await self._fetchall("SELECT value FROM id_lists WHERE name = ?", (name,))
+        return {x[0] for x in rows}
+
+    async def _push_id(self, name: str, value: int):
+        await self._write("INSERT OR IGNORE INTO id_lists VALUES (?, ?)", (name, value))
+
+    async def _pull_id(self, name: str, value: int):
+        await self._write(
+            "DELETE FROM id_lists WHERE name = ? AND value = ?", (name, value)
+        )
+
+    # authusers db #
+    async def _load_authusers(self, chat_id: int) -> dict:
+        rows = await self._fetchall(
+            "SELECT user_id, details FROM authusers WHERE chat_id = ?", (chat_id,)
+        )
+        return {x[0]: json.loads(x[1]) for x in rows}
+
+    async def _insert_authuser(self, chat_id: int, user_id: int, details: dict):
+        await self._write(
+            "INSERT OR REPLACE INTO authusers VALUES (?, ?, ?)",
+            (chat_id, user_id, json.dumps(details)),
+        )
+
+    async def _delete_authuser(self, chat_id: int, user_id: int):
+        await self._write(
+            "DELETE FROM authusers WHERE chat_id = ? AND user_id = ?", (chat_id, user_id)
+        )
+
+    # favorites db #
+    async def get_favs(self, user_id: int) -> dict:
+        rows = await self._fetchall(
+            "SELECT video_id, details FROM favorites WHERE user_id = ? ORDER BY rowid",
+            (user_id,),
+        )
+        return {x[0]: json.loads(x[1]) for x in rows}
+
+    async def add_favorites(self, user_id: int, video_id: str, context: dict):
+        await self._write(
+            "INSERT INTO favorites VALUES (?, ?, ?) "
+            "ON CONFLICT (user_id, video_id) DO UPDATE SET details = excluded.details",
+            (user_id, video_id, json.dumps(context)),
+        )
+
+    async def rem_favorites(self, user_id: int, video_id: str) -> bool:
+        removed = await self._write(
+            "DELETE FROM favorites WHERE user_id = ? AND video_id = ?", (user_id, video_id)
+        )
+        return removed > 0
+
+    async def clear_favorites(self, user_id: int):
+        await self._write("DELETE FROM favorites WHERE user_id = ?", (user_id,))
+
+    async def get_all_favorites(self, user_id: int) -> list:
+        rows = await self._fetchall(
+            "SELECT video_id FROM favorites WHERE user_id = ? ORDER BY rowid", (user_id,)
+        )
+        return [x[0] for x in rows]
+
+    async def get_favorites(self, user_id: int, video_ids: list) -> dict:
+        if not video_ids:
+            return {}
+        marks = ",".join("?" * len(video_ids))
+        rows = await self._fetchall(
+            f"SELECT video_id, details FROM favorites WHERE user_id = ? AND video_id IN ({marks})",
+            (user_id, *video_ids),
+        )
+        return {x[0]: json.loads(x[1]) for x in rows}
+
+    # songs db #
+    async def _songs_count(self) -> int:
+        row = await self._fetchone("SELECT value FROM settings WHERE key = 'songs'")
+        return int(row[0]) if row else 0
+
+    async def update_songs_count(self, count: int):
+        await self._write(
+            "INSERT INTO settings VALUES ('songs', ?) "
+            "ON CONFLICT (key) DO UPDATE SET value = CAST(value AS INTEGER) + excluded.value",
+            (count,),
+        )
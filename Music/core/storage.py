@@ -0,0 +1,566 @@
+import abc
+import datetime
+import threading
+import time
+
+from config import Config
+
+from .logger import LOGS
+from .sessions import ActiveSessions
+
+
+class QueryStats:
+    """Per command and collection (or table) timings of the queries sent to the backend."""
+
+    def __init__(self):
+        self.lock = threading.Lock()  # backends may report from their own threads
+        self.stats = {}  # (command, collection) -> [count, total ms, max ms]
+
+    def record(self, command: str, collection: str, ms: float):
+        with self.lock:
+            stat = self.stats.setdefault((command, collection), [0, 0.0, 0.0])
+            stat[0] += 1
+            stat[1] += ms
+            stat[2] = max(stat[2], ms)
+        if Config.SLOW_QUERY and ms >= Config.SLOW_QUERY:
+            LOGS.warning(f">> Slow query: {command} on {collection} took {ms:.0f} ms")
+
+    def top(self, limit: int = 10) -> list:
+        """[(command, collection, count, avg ms, max ms)] by total time spent."""
+        with self.lock:
+            stats = sorted(self.stats.items(), key=lambda x: x[1][1], reverse=True)
+        return [
+            (cmd, coll, count, round(total / count, 1), round(high, 1))
+            for (cmd, coll), (count, total, high) in stats[:limit]
+        ]
+
+
+class Storage(abc.ABC):
+    """
+    Backend independent part of the database: in-memory state, settings caches
+    and write-behind buffers. A backend implements the abstract storage methods,
+    every caller only sees this async api.
+    """
+
+    def __init__(self):
+        self.timer = QueryStats()
+
+        # local db collections
+        self.sessions = ActiveSessions()
+        self.cache = {}  # settings read from the backend, dropped when they are written
+        self.loop = {}
+        self.watcher = {}
+
+        # write-behind play counters, flushed to the backend in one go
+        self.pending_songs = 0
+        self.pending_users = {}  # user_id -> songs played not yet written
+        self.counter_hooks = []  # async callbacks getting {user_id: count} after a flush
+
+        # known peers, so message handlers don't look up every sender
+        self.peers_loaded = False
+        self.known_users = set()
+        self.known_chats = set()
+        self.names = {}  # user_id -> (user_name, time) last written, only users seen lately
+        self.new_users = {}  # user_id -> user doc not yet written
+        self.new_chats = {}  # chat_id -> chat doc not yet written
+        self.renamed = {}  # user_id -> user name not yet written
+
+    # backend: connection #
+    @abc.abstractmethod
+    async def connect(self):
+        raise NotImplementedError
+
+    # backend: assistants #
+    @abc.abstractmethod
+    async def get_assistant_sessions(self) -> list:
+        raise NotImplementedError
+
+    @abc.abstractmethod
+    async def add_assistant_session(self, session: str):
+        raise NotImplementedError
+
+    @abc.abstractmethod
+    async def remove_assistant_session(self, session: str):
+        raise NotImplementedError
+
+    # backend: users #
+    @abc.abstractmethod
+    async def _insert_user(self, user_id: int, user_name: str, join_date: str):
+        raise NotImplementedError
+
+    @abc.abstractmethod
+    async def _delete_user(self, user_id: int):
+        raise NotImplementedError
+
+    @abc.abstractmethod
+    async def _find_user(self, user_id: int):
+        raise NotImplementedError
+
+    @abc.abstractmethod
+    async def get_all_users(self):
+        """Async iterable of every user document."""
+        raise NotImplementedError
+
+    @abc.abstractmethod
+    async def total_users_count(self) -> int:
+        raise NotImplementedError
+
+    @abc.abstractmethod
+    async def top_users(self, limit: int = 10, user_ids: list = None) -> list:
+        """Users by songs played, sorted and limited by the backend."""
+        raise NotImplementedError
+
+    @abc.abstractmethod
+    async def update_user(self, user_id: int, key: str, value):
+        raise NotImplementedError
+
+    @abc.abstractmethod
+    async def _write_users(self, users: dict, renamed: dict):
+        """Upsert new users {user_id: doc} and rename known ones {user_id: name}."""
+        raise NotImplementedError
+
+    @abc.abstractmethod
+    async def _write_play_counts(self, users: dict):
+        """Increment songs_played by {user_id: count}."""
+        raise NotImplementedError
+
+    @abc.abstractmethod
+    async def _peer_ids(self) -> tuple:
+        """({user_id}, {chat_id}) of everyone stored."""
+        raise NotImplementedError
+
+    # backend: chats #
+    @abc.abstractmethod
+    async def _insert_chat(self, chat_id: int, join_date: datetime.datetime):
+        raise NotImplementedError
+
+    @abc.abstractmethod
+    async def _delete_chat(self, chat_id: int):
+        raise NotImplementedError
+
+    @abc.abstractmethod
+    async def get_chat(self, chat_id: int):
+        raise NotImplementedError
+
+    @abc.abstractmethod
+    async def get_all_chats(self):
+        """Async iterable of every chat document."""
+        raise NotImplementedError
+
+    @abc.abstractmethod
+    async def total_chats_count(self) -> int:
+        raise NotImplementedError
+
+    @abc.abstractmethod
+    async def _write_chats(self, chats: dict):
+        """Insert new chats {chat_id: doc}, keeping the ones already stored."""
+        raise NotImplementedError
+
+    # backend: settings #
+    @abc.abstractmethod
+    async def _load_autoend(self) -> bool:
+        raise NotImplementedError
+
+    @abc.abstractmethod
+    async def _write_autoend(self, autoend: bool):
+        raise NotImplementedError
+
+    @abc.abstractmethod
+    async def _load_ids(self, name: str) -> set:
+        """Members of an id list: authchats, blocked, gbanned or sudo."""
+        raise NotImplementedError
+
+    @abc.abstractmethod
+    async def _push_id(self, name: str, value: int):
+        raise NotImplementedError
+
+    @abc.abstractmethod
+    async def _pull_id(self, name: str, value: int):
+        raise NotImplementedError
+
+    @abc.abstractmethod
+    async def _load_authusers(self, chat_id: int) -> dict:
+        """{user_id: details} of a chat's auth users."""
+        raise NotImplementedError
+
+    @abc.abstractmethod
+    async def _insert_authuser(self, chat_id: int, user_id: int, details: dict):
+        raise NotImplementedError
+
+    @abc.abstractmethod
+    async def _delete_authuser(self, chat_id: int, user_id: int):
+        raise NotImplementedError
+
+    # backend: favorites #
+    @abc.abstractmethod
+    async def get_favs(self, user_id: int) -> dict:
+        raise NotImplementedError
+
+    @abc.abstractmethod
+    async def add_favorites(self, user_id: int, video_id: str, context: dict):
+        raise NotImplementedError
+
+    @abc.abstractmethod
+    async def rem_favorites(self, user_id: int, video_id: str) -> bool:
+        raise NotImplementedError
+
+    @abc.abstractmethod
+    async def clear_favorites(self, user_id: int):
+        raise NotImplementedError
+
+    @abc.abstractmethod
+    async def get_all_favorites(self, user_id: int) -> list:
+        """Video ids of a user's favorites, oldest first."""
+        raise NotImplementedError
+
+    @abc.abstractmethod
+    async def get_favorites(self, user_id: int, video_ids: list) -> dict:
+        """{video_id: details} of the given favorites only."""
+        raise NotImplementedError
+
+    # backend: songs #
+    @abc.abstractmethod
+    async def _songs_count(self) -> int:
+        raise NotImplementedError
+
+    @abc.abstractmethod
+    async def update_songs_count(self, count: int):
+        raise NotImplementedError
+
+    # settings cache #
+    async def _cached(self, key, loader):
+        """Read-through cache of settings-style documents that rarely change."""
+        if key not in self.cache:
+            self.cache[key] = await loader()
+        return self.cache[key]
+
+    def invalidate(self, *keys):
+        for key in keys:
+            self.cache.pop(key, None)
+
+    # users db #
+    async def add_user(self, user_id: int, user_name: str):
+        await self._insert_user(
+            user_id, user_name, datetime.datetime.now().strftime("%d-%m-%Y %H:%M")
+        )
+        self.known_users.add(user_id)
+        self.names[user_id] = (user_name, time.time())
+
+    async def delete_user(self, user_id: int):
+        await self._delete_user(user_id)
+        self.known_users.discard(user_id)
+        self.names.pop(user_id, None)
+        self.new_users.pop(user_id, None)
+        self.renamed.pop(user_id, None)
+
+    async def is_user_exist(self, user_id: int) -> bool:
+        if user_id in self.known_users:
+            return True
+        user = await self._find_user(user_id)
+        return bool(user)
+
+    async def get_user(self, user_id: int):
+        user = await self._find_user(user_id)
+        # seen by the handlers but not flushed yet
+        if user is None and user_id in self.new_users:
+            user = {"user_id": user_id, "songs_played": 0, **self.new_users[user_id]}
+        elif user and user_id in self.renamed:
+            user["user_name"] = self.renamed[user_id]
+        if user and user_id in self.pending_users:
+            user["songs_played"] = (
+                int(user.get("songs_played", 0) or 0) + self.pending_users[user_id]
+            )
+        return user
+
+    # chat db #
+    async def add_chat(self, chat_id: int):
+        await self._insert_chat(chat_id, datetime.datetime.now())
+        self.known_chats.add(chat_id)
+
+    async def delete_chat(self, chat_id: int):
+        await self._delete_chat(chat_id)
+        self.known_chats.discard(chat_id)
+        self.new_chats.pop(chat_id, None)
+
+    async def is_chat_exist(self, chat_id: int) -> bool:
+        if chat_id in self.known_chats:
+            return True
+        chat = await self.get_chat(chat_id)
+        return bool(chat)
+
+    # known peers #
+    async def load_peers(self):
+        """Load the ids of stored users and chats, keeps hot handlers off the database."""
+        start = time.time()
+        users, chats = await self._peer_ids()
+        self.known_users.update(users)
+        self.known_chats.update(chats)
+        self.peers_loaded = True
+        LOGS.info(
+            f">> Loaded {len(self.known_users)} users and {len(self.known_chats)} chats "
+            f"in {time.time() - start:.2f}s"
+        )
+
+    async def see_user(self, user_id: int, user_name: str) -> bool:
+        """Note a message from a user; True if the user is new to the bot."""
+        if not self.peers_loaded:
+            if await self.is_user_exist(user_id):
+                await self.update_user(user_id, "user_name", user_name)
+                return False
+            await self.add_user(user_id, user_name)
+            return True
+
+        now = time.time()
+        if user_id not in self.known_users:
+            self.known_users.add(user_id)
+            self.names[user_id] = (user_name, now)
+            self.new_users[user_id] = {
+                "user_name": user_name,
+                "join_date": datetime.datetime.now().strftime("%d-%m-%Y %H:%M"),
+            }
+            return True
+        # only ids are kept for every user, the name is written once per
+        # NAME_REFRESH for users seen since boot and again when it changes
+        written = self.names.get(user_id)
+        if written is None or (
+            written[0] != user_name and now - written[1] >= Config.NAME_REFRESH
+        ):
+            self.names[user_id] = (user_name, now)
+            if user_id in self.new_users:
+                self.new_users[user_id]["user_name"] = user_name
+            else:
+                self.renamed[user_id] = user_name
+        return False
+
+    async def see_chat(self, chat_id: int) -> bool:
+        """Note a message in a chat; True if the chat is new to the bot."""
+        if not self.peers_loaded:
+            if await self.is_chat_exist(chat_id):
+                return False
+            await self.add_chat(chat_id)
+            return True
+
+        if chat_id in self.known_chats:
+            return False
+        self.known_chats.add(chat_id)
+        self.new_chats[chat_id] = {"join_date": datetime.datetime.now()}
+        return True
+
+    async def flush_peers(self):
+        cutoff = time.time() - Config.NAME_REFRESH
+        for user_id, (_, written) in list(self.names.items()):
+            if written < cutoff:
+                self.names.pop(user_id, None)
+        users, self.new_users = self.new_users, {}
+        renamed, self.renamed = self.renamed, {}
+        chats, self.new_chats = self.new_chats, {}
+        if users or renamed:
+            try:
+                await self._write_users(users, renamed)
+            except Exception as e:
+                self.new_users.update(users)
+                for user_id, name in renamed.items():
+                    self.renamed.setdefault(user_id, name)
+                LOGS.error(f">> Failed to flush new users: {e}")
+        if chats:
+            try:
+                await self._write_chats(chats)
+            except Exception as e:
+                self.new_chats.update(chats)
+                LOGS.error(f">> Failed to flush new chats: {e}")
+
+    # active vc db #
+    async def get_active_vc(self) -> list:
+        return list(self.sessions)
+
+    async def add_active_vc(self, chat_id: int, vc_type: str, assistant: int = None):
+        self.sessions.add(chat_id, vc_type, assistant)
+
+    async def is_active_vc(self, chat_id: int) -> bool:
+        return chat_id in self.sessions
+
+    async def remove_active_vc(self, chat_id: int):
+        self.sessions.remove(chat_id)
+
+    async def total_actvc_count(self) -> int:
+        return len(self.sessions)
+
+    # autoend db #
+    async def get_autoend(self) -> bool:
+        try:
+            return await self._cached("autoend", self._load_autoend)
+        except:
+            return False
+
+    async def set_autoend(self, autoend: bool):
+        await self._write_autoend(autoend is True)
+        self.invalidate("autoend")
+
+    # loop db #
+    async def set_loop(self, chat_id: int, loop: int):
+        self.loop[chat_id] = loop
+
+    async def get_loop(self, chat_id: int) -> int:
+        loop = self.loop.get(chat_id)
+        return loop or 0
+
+    # watcher db #
+    async def set_watcher(self, chat_id: int, key: str, watch: bool):
+        self.watcher[chat_id] = {key: watch}
+
+    async def get_watcher(self, chat_id: int, key: str) -> bool:
+        try:
+            watch = self.watcher[chat_id][key]
+        except KeyError:
+            watch = False
+        return watch
+
+    # id lists #
+    async def _ids(self, name: str) -> set:
+        """In-memory set of an id list, loaded from the backend on first use."""
+        return await self._cached(name, lambda: self._load_ids(name))
+
+    async def _add_id(self, name: str, value: int):
+        await self._push_id(name, value)
+        if name in self.cache:
+            self.cache[name].add(value)
+
+    async def _remove_id(self, name: str, value: int):
+        await self._pull_id(name, value)
+        if name in self.cache:
+            self.cache[name].discard(value)
+
+    # sudousers db #
+    async def get_sudo_users(self) -> list:
+        return list(await self._ids("sudo"))
+
+    async def add_sudo(self, user_id: int) -> bool:
+        await self._add_id("sudo", user_id)
+        return True
+
+    async def remove_sudo(self, user_id: int) -> bool:
+        await self._remove_id("sudo", user_id)
+        return True
+
+    # blocked users db #
+    async def get_blocked_users(self) -> list:
+        return list(await self._ids("blocked"))
+
+    async def add_blocked_user(self, user_id: int) -> bool:
+        await self._add_id("blocked", user_id)
+        return True
+
+    async def remove_blocked_user(self, user_id: int) -> bool:
+        await self._remove_id("blocked", user_id)
+        return True
+
+    async def total_block_count(self) -> int:
+        return len(await self._ids("blocked"))
+
+    # gbanned users db #
+    async def get_gbanned_users(self) -> list:
+        return list(await self._ids("gbanned"))
+
+    async def add_gbanned_user(self, user_id: int) -> bool:
+        await self._add_id("gbanned", user_id)
+        return True
+
+    async def remove_gbanned_users(self, user_id: int) -> bool:
+        await self._remove_id("gbanned", user_id)
+        return True
+
+    async def is_gbanned_user(self, user_id: int) -> bool:
+        return user_id in await self._ids("gbanned")
+
+    async def total_gbans_count(self) -> int:
+        return len(await self._ids("gbanned"))
+
+    # authusers db #
+    async def add_authusers(self, chat_id: int, user_id: int, details: dict):
+        await self._insert_authuser(chat_id, user_id, details)
+        self.invalidate(("authusers", chat_id))
+
+    async def _authusers(self, chat_id: int) -> dict:
+        return await self._cached(
+            ("authusers", chat_id), lambda: self._load_authusers(chat_id)
+        )
+
+    async def is_authuser(self, chat_id: int, user_id: int) -> bool:
+        return user_id in await self._authusers(chat_id)
+
+    async def get_authuser(self, chat_id: int, user_id: int):
+        return (await self._authusers(chat_id)).get(user_id, {})
+
+    async def get_all_authusers(self, chat_id: int) -> list:
+        return list(await self._authusers(chat_id))
+
+    async def get_authusers(self, chat_id: int) -> dict:
+        """{user_id: details} of every auth user of the chat, in one read."""
+        return dict(await self._authusers(chat_id))
+
+    async def remove_authuser(self, chat_id: int, user_id: int):
+        await self._delete_authuser(chat_id, user_id)
+        self.invalidate(("authusers", chat_id))
+
+    # authchats db #
+    async def get_authchats(self) -> list:
+        return list(await self._ids("authchats"))
+
+    async def add_authchat(self, chat_id: int) -> bool:
+        await self._add_id("authchats", chat_id)
+        return True
+
+    async def remove_authchat(self, chat_id: int) -> bool:
+        await self._remove_id("authchats", chat_id)
+        return True
+
+    async def is_authchat(self, chat_id: int) -> bool:
+        return chat_id in await self._ids("authchats")
+
+    # favorites db #
+    async def get_favorite(self, user_id: int, video_id: str) -> dict:
+        favs = await self.get_favorites(user_id, [video_id])
+        return favs.get(video_id, {})
+
+    # songs db #
+    async def total_songs_count(self) -> int:
+        return await self._songs_count() + self.pending_songs
+
+    # play counters #
+    def count_play(self, user_id: int, count: int = 1):
+        """Add a play to the write-behind counters, written by flush_counters."""
+        self.pending_songs += count
+        self.pending_users[user_id] = self.pending_users.get(user_id, 0) + count
+
+    def pending_counters(self) -> dict:
+        return {
+            "songs": self.pending_songs,
+            "users": len(self.pending_users),
+        }
+
+    async def flush_counters(self):
+        # new users first, so their counts land on complete documents
+        await self.flush_peers()
+        songs, self.pending_songs = self.pending_songs, 0
+        users, self.pending_users = self.pending_users, {}
+        if songs:
+            try:
+                await self.update_songs_count(songs)
+            except Exception as e:
+                self.pending_songs += songs
+                LOGS.error(f">> Failed to flush songs count: {e}")
+        if users:
+            try:
+                await self._write_play_counts(users)
+            except Exception as e:
+                for user_id, count in users.items():
+                    self.pending_users[user_id] = (
+                        self.pending_users.get(user_id, 0) + count
+                    )
+                LOGS.error(f">> Failed to flush user play counts: {e}")
+                return
+            for hook in self.counter_hooks:
+                try:
+                    await hook(users)
+                except Exception as e:
+                    LOGS.error(f">> Play counter hook failed: {e}")
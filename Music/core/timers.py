@@ -0,0 +1,112 @@
+import asyncio
+import datetime
+import heapq
+import itertools
+import time
+
+import pytz
+
+from .logger import LOGS
+
+
+class TimerService:
+    """
+    One task driving every timed job of the bot.
+    - per key deadlines in a heap, scheduling a key again reschedules it
+    - cancelled / rescheduled entries are skipped when they come up
+    - repeating jobs are scheduled again after each run finishes,
+      so a slow run never overlaps the next one
+    """
+
+    def __init__(self):
+        self.heap = []  # (deadline, seq, key)
+        self.jobs = {}  # key -> (deadline, seq, func, args, interval)
+        self.seq = itertools.count()
+        self.wakeup = None
+        self.runner = None
+
+    def _ensure_runner(self):
+        if self.wakeup is None:
+            self.wakeup = asyncio.Event()
+        if self.runner is None or self.runner.done():
+            self.runner = asyncio.ensure_future(self._run())
+
+    def schedule(self, key, delay: float, func, *args, interval: float = 0):
+        """Run func(*args) after delay seconds, replacing any job with the same key."""
+        deadline = time.monotonic() + delay
+        seq = next(self.seq)
+        self.jobs[key] = (deadline, seq, func, args, interval)
+        heapq.heappush(self.heap, (deadline, seq, key))
+        self._ensure_runner()
+        if self.heap[0][1] == seq:
+            self.wakeup.set()
+
+    def every(self, key, interval: float, func, *args):
+        self.schedule(key, interval, func, *args, interval=interval)
+
+    def daily(self, key, hour: int, minute: int, tz: str, func, *args):
+        """Run func(*args) every day at hour:minute in the given timezone."""
+        zone = pytz.timezone(tz)
+        now = datetime.datetime.now(zone)
+        at = now.replace(hour=hour, minute=minute, second=0, microsecond=0)
+        if at <= now:
+            at += datetime.timedelta(days=1)
+        self.schedule(
+            key,
+            (at - now).total_seconds(),
+            self._daily,
+            key,
+            hour,
+            minute,
+            tz,
+            func,
+            *args,
+        )
+
+    async def _daily(self, key, hour, minute, tz, func, *args):
+        try:
+            await func(*args)
+        finally:
+            self.daily(key, hour, minute, tz, func, *args)
+
+    def cancel(self, key) -> bool:
+        return self.jobs.pop(key, None) is not None
+
+    def pending(self, key) -> bool:
+        return key in self.jobs
+
+    def remaining(self, key) -> float:
+        job = self.jobs.get(key)
+        return max(job[0] - time.monotonic(), 0) if job else None
+
+    async def _call(self, key, seq: int, func, args: tuple, interval: float):
+        try:
+            await func(*args)
+        except Exception as e:
+            LOGS.error(f">> Timer job {key} failed: {e}")
+        job = self.jobs.get(key)
+        if interval and job and job[1] == seq:
+            self.schedule(key, interval, func, *args, interval=interval)
+
+    async def _run(self):
+        while True:
+            now = time.monotonic()
+            while self.heap and self.heap[0][0] <= now:
+                _, seq, key = heapq.heappop(self.heap)
+                job = self.jobs.get(key)
+                if job is None or job[1] != seq:
+                    continue
+                _, _, func, args, interval = job
+                if not interval:
+                    self.jobs.pop(key, None)
+                asyncio.ensure_future(self._call(key, seq, func, args, interval))
+
+            timeout = self.heap[0][0] - time.monotonic() if self.heap else None
+            self.wakeup.clear()
+            try:
+                await asyncio.wait_for(self.wakeup.wait(), timeout)
+            except asyncio.TimeoutError:
+                pass
+
+
+timers = TimerService()
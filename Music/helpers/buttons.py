@@ -66,18 +66,20 @@ class MakeButtons:
                 ],
             ]
         try:
+            tracks = await db.get_favorites(user_id, collection[page])
             for track in collection[page]:
                 index += 1
-                favs = await db.get_favorite(user_id, str(track))
+                favs = tracks[str(track)]
                 txt += f"**{'0' if index < 10 else ''}{index}:** {favs['title']}\n"
                 txt += f"    **Duration:** {favs['duration']}\n"
                 txt += f"    **Since:** {favs['add_date']}\n\n"
                 btns.append(self.ikb(text=f"{index}", callback_data=f"delfavs|{track}|{user_id}"))
         except:
             page = 0
+            tracks = await db.get_favorites(user_id, collection[page])
             for track in collection[page]:
                 index += 1
-                favs = await db.get_favorite(user_id, track)
+                favs = tracks[track]
                 txt += f"**{'0' if index < 10 else ''}{index}:** {favs['title']}\n"
                 txt += f"    **Duration:** {favs['duration']}\n"
                 txt += f"    **Since:** {favs['add_date']}\n\n"
@@ -86,6 +86,16 @@ class TEXTS:
         "    __Uptime:__ `{10}`\n\n"
         "**</>** {11}"
     )
+    ADMISSION = (
+        "**⤞ Stream Capacity:**\n"
+        "    __Total Streams:__ `{0} / {2}`\n"
+        "    __Video Streams:__ `{1} / {3}`\n"
+        "    __CPU:__ `{4}% / {5}`\n"
+        "    __RAM:__ `{6}% / {7}`\n"
+        "    __Upload:__ `{8} / {9} Mbit/s`\n"
+        "    __Cost per Stream:__ `{10}% cpu, {11} MB, {12} Mbit/s`\n"
+        "    __Refused / Downgraded:__ `{13} / {14}`"
+    )
     SYSTEM = (
         "**⤞ System Info:**\n\n"
         "   __Core:__ `{0} cores`\n"
@@ -119,6 +129,8 @@ class TEXTS:
         "    __Seek the playing track in the voice chat. Use [/seek 10] to seek forward and [/seek-10] to seek backwards.__\n\n"
         "**» /clean**\n"
         "    __Clear the queue when bot seems to be bugged.__\n\n"
+        "**» /quality**\n"
+        "    __Set the stream quality of this chat: high, medium, low or default.__\n\n"
     )
     HELP_USER = (
         "**Normal Users Commands:**\n\n"
@@ -145,6 +157,10 @@ class TEXTS:
         "**Sudo Users Commands:**\n\n"
         "**» /active**\n"
         "    __Check active voice chats of the bot.__\n\n"
+        "**» /assistants**\n"
+        "    __List the assistants pool with their load.__\n\n"
+        "**» /addassistant ; /drain**\n"
+        "    __Add an assistant from a string session or move its chats away and remove it.__\n\n"
         "**» /autoend**\n"
         "    __Enable or disable autoend inactive voice chats.__\n\n"
         "**» /block ; /unblock**\n"
@@ -161,6 +177,8 @@ class TEXTS:
         "    __Restart the bot globally.__\n\n"
         "**» /sudolist**\n"
         "    __List all sudo users.__\n\n"
+        "**» /setquality**\n"
+        "    __Set the default stream quality of all chats.__\n\n"
         "**» /stats**\n"
         "    __Show full stats of the bot.__\n\n"
     )
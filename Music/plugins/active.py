@@ -22,11 +22,9 @@ async def activevc(_, message: Message):
     collection = []
     for x in active_chats:
         cid = int(x["chat_id"])
-        if cid == 0:
-            continue
         joined = x["join_time"]
         vc_type = x["vc_type"]
-        participants = len(await hellmusic.vc_participants(cid))
+        participants = len(await hellmusic.participant_ids(cid))
         try:
             check = Queue.get_queue(cid)
             song = check[0]["title"]
@@ -48,11 +46,14 @@ async def activevc(_, message: Message):
             "active_since": f"{_hours} hrs, {_minutes} mins.",
             "playing": song,
             "vc_type": vc_type,
+            "assistant": hellmusic.assistant_of(cid),
         }
         collection.append(context)
     if len(collection) == 0:
         return await hell.edit(f"No active voice chats found!")
-    await MakePages.activevc_page(hell, collection, 0, 0, True)
+    await MakePages.activevc_page(
+        hell, collection, 0, 0, True, hellmusic.assistant_load()
+    )
 
 
 @hellbot.app.on_callback_query(filters.regex(r"activevc") & ~Config.BANNED_USERS)
@@ -64,11 +65,9 @@ async def activevc_cb(_, cb: CallbackQuery):
     active_chats = await db.get_active_vc()
     for x in active_chats:
         cid = int(x["chat_id"])
-        if cid == 0:
-            continue
         joined = x["join_time"]
         vc_type = x["vc_type"]
-        participants = len(await hellmusic.vc_participants(cid))
+        participants = len(await hellmusic.participant_ids(cid))
         try:
             check = Queue.get_queue(cid)
             song = check[0]["title"]
@@ -90,6 +89,7 @@ async def activevc_cb(_, cb: CallbackQuery):
             "active_since": f"{_hours} hrs, {_minutes} mins.",
             "playing": song,
             "vc_type": vc_type,
+            "assistant": hellmusic.assistant_of(cid),
         }
         collection.append(context)
     last_page, _ = formatter.group_the_list(collection, length=True)
@@ -101,4 +101,6 @@ async def activevc_cb(_, cb: CallbackQuery):
     else:
         new_page = page + 1 if cmd == "next" else page - 1
     index = new_page * 5
-    await MakePages.activevc_page(cb, collection, new_page, index, True)
+    await MakePages.activevc_page(
+        cb, collection, new_page, index, True, hellmusic.assistant_load()
+    )
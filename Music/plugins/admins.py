@@ -20,47 +20,26 @@ async def auth(_, message: Message):
             return await message.reply_text(
                 "Reply to a user or give a user id or username"
             )
-        all_auths = await db.get_all_authusers(message.chat.id)
-        count = len(all_auths)
-        if count == 30:
-            return await message.reply_text(
-                "AuthList is full! \n\nLimit of Auth Users in a chat is: `30`"
-            )
         user = message.text.split(" ", 1)[1]
         user = user.replace("@", "")
         user = await hellbot.app.get_users(user)
-        is_auth = await db.is_authuser(message.chat.id, user.id)
-        if not is_auth:
-            context = {
-                "user_name": user.first_name,
-                "auth_by_id": message.from_user.id,
-                "auth_by_name": message.from_user.first_name,
-                "auth_date": datetime.datetime.now().strftime("%d-%m-%Y %H:%M"),
-            }
-            await db.add_authusers(message.chat.id, user.id, context)
-            await message.reply_text("Successfully Authorized user in this chat!")
-        else:
-            await message.reply_text("This user is already Authorized in this chat!")
     else:
-        all_auths = await db.get_all_authusers(message.chat.id)
-        count = len(all_auths)
-        if count == 30:
-            return await message.reply_text(
-                "AuthList is full! \n\nLimit of Auth Users in a chat is: `30`"
-            )
         user = message.reply_to_message.from_user
-        is_auth = await db.is_authuser(message.chat.id, user.id)
-        if not is_auth:
-            context = {
-                "user_name": user.first_name,
-                "auth_by_id": message.from_user.id,
-                "auth_by_name": message.from_user.first_name,
-                "auth_date": datetime.datetime.now().strftime("%d-%m-%Y %H:%M"),
-            }
-            await db.add_authusers(message.chat.id, user.id, context)
-            await message.reply_text("Successfully Authorized user in this chat!")
-        else:
-            await message.reply_text("This user is already Authorized in this chat!")
+    all_auths = await db.get_authusers(message.chat.id)
+    if user.id in all_auths:
+        return await message.reply_text("This user is already Authorized in this chat!")
+    if len(all_auths) >= 30:
+        return await message.reply_text(
+            "AuthList is full! \n\nLimit of Auth Users in a chat is: `30`"
+        )
+    context = {
+        "user_name": user.first_name,
+        "auth_by_id": message.from_user.id,
+        "auth_by_name": message.from_user.first_name,
+        "auth_date": datetime.datetime.now().strftime("%d-%m-%Y %H:%M"),
+    }
+    await db.add_authusers(message.chat.id, user.id, context)
+    await message.reply_text("Successfully Authorized user in this chat!")
 
 
 @hellbot.app.on_message(
@@ -98,14 +77,13 @@ async def unauth(_, message: Message):
 )
 @check_mode
 async def authusers(_, message: Message):
-    all_auths = await db.get_all_authusers(message.chat.id)
+    all_auths = await db.get_authusers(message.chat.id)
     if not all_auths:
         await message.reply_text("No Authorized users in this chat!")
     else:
         hell = await message.reply_text("Fetching Authorized users in this chat ...")
         collection = []
-        for user in all_auths:
-            data = await db.get_authuser(message.chat.id, user)
+        for data in all_auths.values():
             user_name = data["user_name"]
             admin_id = data["auth_by_id"]
             admin_name = data["auth_by_name"]
@@ -0,0 +1,63 @@
+from pyrogram import filters
+from pyrogram.enums import ChatType
+from pyrogram.types import Message
+
+from config import Config
+from Music.core.calls import hellmusic
+from Music.core.clients import hellbot
+from Music.core.decorators import UserWrapper
+
+
+@hellbot.app.on_message(filters.command("assistants") & Config.SUDO_USERS)
+@UserWrapper
+async def assistants_list(_, message: Message):
+    loads = hellmusic.assistant_load()
+    if not loads:
+        return await message.reply_text("No assistants in the pool!")
+    text = "**Assistants Pool:**\n\n"
+    for load in loads:
+        text += f"**#{load['index']}** {load['name']} — __{load['state']}__\n"
+        text += f"    **Streams:** __{load['streams']} ({load['video']} video)__\n"
+        text += f"    **Errors:** __{load['errors']}{' (floodwait)' if load['flooded'] else ''}__\n"
+        text += f"    **Load:** __{load['load']}__\n\n"
+    await message.reply_text(text)
+
+
+@hellbot.app.on_message(filters.command("addassistant") & Config.SUDO_USERS)
+@UserWrapper
+async def add_assistant(_, message: Message):
+    # UserWrapper already deleted the message, the session is never left in the chat
+    if message.chat.type != ChatType.PRIVATE:
+        return await message.reply_text(
+            "Send string sessions in my private chat only! This one was exposed here, revoke it and generate a new one.",
+            quote=False,
+        )
+    if len(message.command) != 2:
+        return await message.reply_text(
+            "Give a pyrogram string session to add a new assistant. \n\n**Example:** `/addassistant <session>`"
+        )
+    hell = await message.reply_text("Starting new assistant ...")
+    try:
+        index = await hellmusic.add_assistant(message.command[1])
+    except Exception as e:
+        return await hell.edit_text(str(e))
+    name = getattr(hellmusic.assistants[index], "mention", f"Assistant {index + 1}")
+    await hell.edit_text(f"**Added Assistant #{index + 1}:** {name}")
+
+
+@hellbot.app.on_message(filters.command(["drain", "rmassistant"]) & Config.SUDO_USERS)
+@UserWrapper
+async def drain_assistant(_, message: Message):
+    if len(message.command) != 2 or not message.command[1].isdigit():
+        return await message.reply_text(
+            "Give the assistant number to drain. Check /assistants for the list."
+        )
+    index = int(message.command[1]) - 1
+    hell = await message.reply_text(f"Draining Assistant #{index + 1} ...")
+    try:
+        moved, failed = await hellmusic.drain_assistant(index)
+    except Exception as e:
+        return await hell.edit_text(str(e))
+    await hell.edit_text(
+        f"**Drained Assistant #{index + 1}!**\n\n**Moved Chats:** `{moved}`\n**Stopped Chats:** `{failed}`"
+    )
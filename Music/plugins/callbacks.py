@@ -11,7 +11,6 @@ from Music.helpers.strings import TEXTS
 from Music.utils.admins import get_auth_users
 from Music.utils.play import player
 from Music.utils.queue import Queue
-from Music.utils.youtube import ytube
 
 
 @hellbot.app.on_callback_query(filters.regex(r"close") & ~Config.BANNED_USERS)
@@ -109,8 +108,7 @@ async def controler_cb(_, cb: CallbackQuery):
         else:
             return await cb.answer("Already unmuted!", show_alert=True)
     elif action == "end":
-        await hellmusic.leave_vc(cb.message.chat.id)
-        await db.set_loop(cb.message.chat.id, 0)
+        await player.stop(cb.message.chat.id)
         await cb.answer("Left the VC!", show_alert=True)
         return await cb.message.reply_text(f"__VC Stopped by:__ {cb.from_user.mention}")
     elif action == "loop":
@@ -155,23 +153,10 @@ async def controler_cb(_, cb: CallbackQuery):
         if (played - seek_time) <= 10:
             return await cb.answer("Cannot seek beyond 10 seconds!", show_alert=True)
         to_seek = played - seek_time
-        video = True if que[0]["vc_type"] == "video" else False
-        if que[0]["file"] == que[0]["video_id"]:
-            file_path = await ytube.download(que[0]["video_id"], True, video)
-        else:
-            file_path = que[0]["file"]
         try:
-            context = {
-                "chat_id": que[0]["chat_id"],
-                "file": file_path,
-                "duration": que[0]["duration"],
-                "seek": formatter.secs_to_mins(to_seek),
-                "video": video,
-            }
-            await hellmusic.seek_vc(context)
+            await player.seek(cb.message.chat.id, to_seek)
         except:
             return await cb.answer("Something went wrong!", show_alert=True)
-        Queue.update_duration(cb.message.chat.id, 0, to_seek)
         await cb.message.reply_text(
             f"__Seeked back by {seek_time} seconds!__ \n\nBy: {cb.from_user.mention}"
         )
@@ -186,17 +171,9 @@ async def controler_cb(_, cb: CallbackQuery):
             return await cb.answer("Cannot seek beyond 10 seconds!", show_alert=True)
         to_seek = played + seek_time
         try:
-            context = {
-                "chat_id": que[0]["chat_id"],
-                "file": que[0]["file"],
-                "duration": que[0]["duration"],
-                "seek": formatter.secs_to_mins(to_seek),
-                "video": True if que[0]["vc_type"] == "video" else False,
-            }
-            await hellmusic.seek_vc(context)
+            await player.seek(cb.message.chat.id, to_seek)
         except:
             return await cb.answer("Something went wrong!", show_alert=True)
-        Queue.update_duration(cb.message.chat.id, 1, to_seek)
         await cb.message.reply_text(
             f"__Seeked forward by {seek_time} seconds!__ \n\nBy: {cb.from_user.mention}"
         )
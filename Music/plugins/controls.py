@@ -6,10 +6,10 @@ from Music.core.calls import hellmusic
 from Music.core.clients import hellbot
 from Music.core.database import db
 from Music.core.decorators import AuthWrapper, check_mode
+from Music.core.mailbox import mailbox
 from Music.helpers.formatters import formatter
 from Music.utils.play import player
 from Music.utils.queue import Queue
-from Music.utils.youtube import ytube
 
 
 @hellbot.app.on_message(
@@ -72,8 +72,7 @@ async def pause_resume(_, message: Message):
 @check_mode
 @AuthWrapper
 async def stop_end(_, message: Message):
-    await hellmusic.leave_vc(message.chat.id)
-    await db.set_loop(message.chat.id, 0)
+    await player.stop(message.chat.id)
     await message.reply_text(f"__VC Stopped by:__ {message.from_user.mention}")
 
 
@@ -112,6 +111,33 @@ async def loop(_, message: Message):
         )
 
 
+@hellbot.app.on_message(filters.command("quality") & filters.group & ~Config.BANNED_USERS)
+@check_mode
+@AuthWrapper
+async def quality(_, message: Message):
+    current = hellmusic.quality.get(message.chat.id)
+    if len(message.command) < 2:
+        return await message.reply_text(
+            f"__Stream quality of this chat:__ `{current}`\n\n**Usage:** `/quality high|medium|low|default`"
+        )
+    profile = message.command[1].lower()
+    if profile not in ("high", "medium", "low", "default"):
+        return await message.reply_text(
+            "Please choose one of: `high`, `medium`, `low` or `default`."
+        )
+    hellmusic.quality.set(message.chat.id, profile)
+    if Queue.get_current(message.chat.id):
+        try:
+            await mailbox.post(
+                message.chat.id, "restream", hellmusic.restream, message.chat.id
+            )
+        except Exception:
+            pass
+    await message.reply_text(
+        f"__Stream quality set to:__ `{hellmusic.quality.get(message.chat.id)}`\n__By:__ {message.from_user.mention}"
+    )
+
+
 @hellbot.app.on_message(
     filters.command("replay") & filters.group & ~Config.BANNED_USERS
 )
@@ -188,23 +214,10 @@ async def seek(_, message: Message):
                 "Cannot seek when only 10 seconds are left! Use a lesser value."
             )
         to_seek = played + seek_time
-    video = True if que[0]["vc_type"] == "video" else False
-    if que[0]["file"] == que[0]["video_id"]:
-        file_path = await ytube.download(que[0]["video_id"], True, video)
-    else:
-        file_path = que[0]["file"]
     try:
-        context = {
-            "chat_id": que[0]["chat_id"],
-            "file": file_path,
-            "duration": que[0]["duration"],
-            "seek": formatter.secs_to_mins(to_seek),
-            "video": video,
-        }
-        await hellmusic.seek_vc(context)
+        await player.seek(message.chat.id, to_seek)
     except:
         return await hell.edit_text("Something went wrong!")
-    Queue.update_duration(message.chat.id, seek_type, seek_time)
     await hell.edit_text(
         f"Seeked `{seek_time}` seconds {'forward' if seek_type == 1 else 'backward'}!"
     )
@@ -1,5 +1,8 @@
 from pyrogram import filters
+from Music.core.calls import hellmusic
 from Music.core.clients import hellbot
+from Music.core.database import db
+from Music.utils.transcode import transcoder
 from Music.utils.youtube import format_download_stats
 from config import Config  # or your sudo system
 
@@ -9,4 +12,18 @@ async def download_stats_cmd(_, message):
     Show audio/video download success & failure counts.
     """
     text = format_download_stats()
+    gaps = hellmusic.transition_stats()
+    text += (
+        "\n\n**⏭ Track Transitions**\n\n"
+        f"**Total:** `{gaps['total']}`\n"
+        f"**Prefetched:** `{gaps['prepared']}`\n"
+        f"**Avg Gap:** `{gaps['avg']} ms`\n"
+        f"**Max Gap:** `{gaps['max']} ms`\n"
+        f"**Reused Copies:** `{transcoder.reused}`"
+    )
+    queries = db.timer.top(5)
+    if queries:
+        text += "\n\n**🗄 Database Queries** __(count / avg / max)__\n\n"
+        for cmd, coll, count, avg, high in queries:
+            text += f"**{cmd} {coll}:** `{count}` / `{avg} ms` / `{high} ms`\n"
     await message.reply_text(text)
@@ -28,13 +28,10 @@ from Music.utils.youtube import ytube
 async def play_music(_, message: Message, context: dict):
     user_name = message.from_user.first_name
     user_id = message.from_user.id
-    if not await db.is_user_exist(user_id):
-        await db.add_user(user_id, user_name)
-    else:
-        try:
-            await db.update_user(user_id, "user_name", user_name)
-        except:
-            pass
+    try:
+        await db.see_user(user_id, user_name)
+    except:
+        pass
     hell = await message.reply_text("Processing ...")
     # initialise variables
     video, force, url, tgaud, tgvid = context.values()
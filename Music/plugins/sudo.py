@@ -45,6 +45,25 @@ async def auto_end_stream(_, message: Message):
         )
 
 
+@hellbot.app.on_message(filters.command("setquality") & Config.SUDO_USERS)
+@UserWrapper
+async def set_quality(_, message: Message):
+    if len(message.command) != 2 or message.command[1].lower() not in (
+        "high",
+        "medium",
+        "low",
+    ):
+        return await message.reply_text(
+            f"**Default stream quality:** `{hellmusic.quality.default}`\n"
+            f"**CPU step down:** `{hellmusic.quality.step}`\n\n"
+            "**Usage:** `/setquality high|medium|low`"
+        )
+    hellmusic.quality.set_default(message.command[1].lower())
+    await message.reply_text(
+        f"Default stream quality set to `{hellmusic.quality.default}`. Applies from the next track."
+    )
+
+
 @hellbot.app.on_message(filters.command(["gban", "block"]) & Config.SUDO_USERS)
 @UserWrapper
 async def gban(_, message: Message):
@@ -232,6 +251,8 @@ async def restart_(_, message: Message):
     await hell.edit(
         f"Notified **{count}** chat(s) about the restart.\n\nRestarting now..."
     )
+    # kill -9 skips the shutdown flush, write out buffered counters and peers now
+    await db.flush_counters()
     os.system(f"kill -9 {os.getpid()} && bash start")
 
 
@@ -2,11 +2,13 @@ from pyrogram import filters
 from pyrogram.types import InlineKeyboardMarkup, Message
 
 from config import Config
+from Music.core.admission import admission
 from Music.core.clients import hellbot
 from Music.core.database import db
 from Music.core.decorators import UserWrapper, check_mode
 from Music.helpers.buttons import Buttons
 from Music.helpers.formatters import formatter
+from Music.helpers.strings import TEXTS
 from Music.helpers.users import MusicUser
 from Music.utils.admins import get_user_type
 from Music.utils.leaderboard import leaders
@@ -69,8 +71,29 @@ async def stats(_, message: Message):
         11: stats["uptime"],
         12: hellbot.app.mention,
     }
+    capacity = admission.stats()
+    pending = db.pending_counters()
     await hell.edit_text(
-        MusicUser.get_stats_text(context),
+        MusicUser.get_stats_text(context)
+        + "\n\n"
+        + TEXTS.ADMISSION.format(
+            capacity["voice"] + capacity["video"],
+            capacity["video"],
+            capacity["max_streams"],
+            capacity["max_video"],
+            capacity["host_cpu"],
+            capacity["max_cpu"],
+            capacity["host_ram"],
+            capacity["max_ram"],
+            capacity["host_net"],
+            capacity["max_net"],
+            capacity["cpu"],
+            capacity["ram"],
+            capacity["net"],
+            capacity["refused"],
+            capacity["downgraded"],
+        )
+        + f"\n    __Pending Play Counts:__ `{pending['songs']} plays, {pending['users']} users`",
         reply_markup=InlineKeyboardMarkup(Buttons.close_markup()),
     )
 
@@ -1,19 +1,22 @@
 import asyncio
-import datetime
 
-from apscheduler.schedulers.asyncio import AsyncIOScheduler
 from pyrogram import filters
-from pyrogram.types import Message
+from pyrogram.enums import ChatMemberStatus
+from pyrogram.types import ChatMemberUpdated, Message
 from pytgcalls.types import JoinedGroupCallParticipant, LeftGroupCallParticipant, Update
 from pytgcalls.types.stream import StreamAudioEnded
 
 from config import Config
+from Music.core.admission import admission
 from Music.core.calls import hellmusic
 from Music.core.clients import hellbot
 from Music.core.database import db
 from Music.core.logger import LOGS
+from Music.core.mailbox import mailbox
+from Music.core.timers import timers
 from Music.helpers.buttons import Buttons
 from Music.utils.leaderboard import leaders
+from Music.utils.play import player
 from Music.utils.queue import Queue
 
 
@@ -21,9 +24,8 @@ from Music.utils.queue import Queue
 async def new_users_private(_, msg: Message):
     chat_id = msg.from_user.id
     user_name = msg.from_user.first_name
-    if not await db.is_user_exist(chat_id):
+    if await db.see_user(chat_id, user_name):
         BOT_USERNAME = hellbot.app.username
-        await db.add_user(chat_id, user_name)
         if Config.LOGGER_ID:
             await hellbot.logit(
                 "newuser",
@@ -33,20 +35,14 @@ async def new_users_private(_, msg: Message):
             )
         else:
             LOGS.info(f"#NewUser: \n\nName: {user_name} \nID: {chat_id}")
-    else:
-        try:
-            await db.update_user(chat_id, "user_name", user_name)
-        except:
-            pass
     await msg.continue_propagation()
 
 
 @hellbot.app.on_message(filters.group, group=3)
 async def new_users_group(_, msg: Message):
     chat_id = msg.chat.id
-    if not await db.is_chat_exist(chat_id):
+    if await db.see_chat(chat_id):
         BOT_USERNAME = hellbot.app.username
-        await db.add_chat(chat_id)
         if Config.LOGGER_ID:
             await hellbot.logit(
                 "newchat",
@@ -68,44 +64,61 @@ async def new_users_group(_, msg: Message):
 async def vc_end(_, msg: Message):
     chat_id = msg.chat.id
     try:
-        await hellmusic.leave_vc(chat_id)
-        await db.set_loop(chat_id, 0)
+        await player.stop(chat_id)
     except:
         pass
     await msg.continue_propagation()
 
 
+@hellbot.app.on_message(filters.left_chat_member, group=5)
+async def member_left(_, msg: Message):
+    hellmusic.forget_member(msg.chat.id, msg.left_chat_member.id)
+    await msg.continue_propagation()
+
+
+@hellbot.app.on_chat_member_updated(group=5)
+async def member_updated(_, update: ChatMemberUpdated):
+    new = update.new_chat_member
+    if new and new.status not in (
+        ChatMemberStatus.LEFT,
+        ChatMemberStatus.BANNED,
+        ChatMemberStatus.RESTRICTED,
+    ):
+        return
+    member = new or update.old_chat_member
+    if member and member.user:
+        hellmusic.forget_member(update.chat.id, member.user.id)
+
+
 # ============================================================
 #   MULTI–ASSISTANT EVENT BINDING (ALL PYTGCALLS CLIENTS)
 # ============================================================
 
-# Collect all PyTgCalls clients we need to listen to:
-MUSIC_CLIENTS = getattr(hellmusic, "_music_clients", None)
-if not MUSIC_CLIENTS:
-    # fallback for single-assistant / legacy mode
-    base = getattr(hellmusic, "music", None)
-    MUSIC_CLIENTS = [base] if base else []
-
+# We register the same handlers on EACH PyTgCalls client, so all
+# assistants (including ones added at runtime) trigger these events.
 
-# We register the same handlers on EACH PyTgCalls client, so
-# all assistants (1–4) correctly trigger these events.
-
-for _mc in MUSIC_CLIENTS:
+def _bind_handlers(_mc):
 
     @_mc.on_kicked()
     @_mc.on_left()
     async def _end_streaming(_, chat_id: int):
+        # ignore events from an assistant the chat was moved away from
+        if hellmusic.music_of(chat_id) is not _mc:
+            return
         try:
-            await hellmusic.leave_vc(chat_id)
-            await db.set_loop(chat_id, 0)
+            await player.stop(chat_id)
         except:
             pass
 
     @_mc.on_stream_end()
     async def _changed(_, update: Update):
         if isinstance(update, StreamAudioEnded):
+            if hellmusic.music_of(update.chat_id) is not _mc:
+                return
             try:
-                await hellmusic.change_vc(update.chat_id)
+                await mailbox.post(
+                    update.chat_id, "change", hellmusic.change_vc, update.chat_id
+                )
             except Exception:
                 pass
 
@@ -115,73 +128,58 @@ for _mc in MUSIC_CLIENTS:
             update, LeftGroupCallParticipant
         ):
             return
+        # untracked chats would be placed on an assistant and fetched in full
+        if hellmusic.music_of(update.chat_id) is not _mc:
+            return
         try:
             chat_id = update.chat_id
-            audience = hellmusic.audience.get(chat_id)
-            users = await hellmusic.vc_participants(chat_id)
-            user_ids = [user.user_id for user in users]
-            if not audience:
-                await hellmusic.autoend(chat_id, user_ids)
-            else:
-                new = (
-                    audience + 1
-                    if isinstance(update, JoinedGroupCallParticipant)
-                    else audience - 1
-                )
-                hellmusic.audience[chat_id] = new
-                await hellmusic.autoend(chat_id, user_ids)
+            users = hellmusic.participant_update(
+                chat_id,
+                update.participant.user_id,
+                isinstance(update, JoinedGroupCallParticipant),
+            )
+            if users is None:
+                users = await hellmusic.participant_ids(chat_id)
+            await hellmusic.autoend(chat_id, list(users))
         except:
             return
 
 
+hellmusic.bind(_bind_handlers)
+
+
 # ============================================================
 #   WATCHERS & LEADERBOARD
 # ============================================================
 
 async def update_played():
-    while not await asyncio.sleep(1):
-        active_chats = await db.get_active_vc()
-        for x in active_chats:
-            chat_id = int(x["chat_id"])
-            if chat_id == 0:
-                continue
-            is_paused = await db.get_watcher(chat_id, "pause")
-            if is_paused:
-                continue
-            que = Queue.get_queue(chat_id)
-            if que == []:
-                continue
-            Queue.update_duration(chat_id, 1, 1)
-
-
-asyncio.create_task(update_played())
-
-
-async def end_inactive_vc():
-    while not await asyncio.sleep(10):
-        for chat_id in db.inactive:
-            dur = db.inactive.get(chat_id)
-            if dur == {}:
-                continue
-            if datetime.datetime.now() > dur:
-                if not await db.is_active_vc(chat_id):
-                    db.inactive[chat_id] = {}
-                    continue
-                db.inactive[chat_id] = {}
-                try:
-                    await hellmusic.leave_vc(chat_id)
-                except:
-                    continue
-                try:
-                    await hellbot.app.send_message(
-                        chat_id,
-                        "⏹️ **Inactive VC:** Streaming has been stopped!",
-                    )
-                except:
-                    continue
-
-
-asyncio.create_task(end_inactive_vc())
+    active_chats = await db.get_active_vc()
+    for x in active_chats:
+        chat_id = int(x["chat_id"])
+        is_paused = await db.get_watcher(chat_id, "pause")
+        if is_paused:
+            continue
+        que = Queue.get_queue(chat_id)
+        if que == []:
+            continue
+        Queue.update_duration(chat_id, 1, 1)
+        if hellmusic.should_prepare(chat_id):
+            asyncio.create_task(hellmusic.prepare_next(chat_id))
+
+
+async def sync_participants():
+    # participant updates can be missed, rebuild the tracked sets now and then
+    for chat_id in list(hellmusic.participants):
+        if not await db.is_active_vc(chat_id):
+            continue
+        try:
+            await hellmusic.reconcile_participants(chat_id)
+        except Exception:
+            continue
+
+
+async def measure_streams():
+    admission.measure()
 
 
 async def leaderboard():
@@ -191,14 +189,30 @@ async def leaderboard():
         "client": hellbot.app,
     }
     username = hellbot.app.username
+    # write out pending plays so the broadcast is exact
+    await db.flush_counters()
     text = await leaders.generate(context)
     btns = Buttons.add_markup(username)
     await leaders.broadcast(hellbot, text, btns)
 
 
-hrs = leaders.get_hrs()
-min = leaders.get_min()
+def track_sessions(event: str, session: dict):
+    # the played counter only has to tick while something is streaming
+    if event == "start" and not timers.pending("played"):
+        timers.every("played", 1, update_played)
+    elif event == "end" and not len(db.sessions):
+        timers.cancel("played")
+
+
+db.sessions.subscribe(track_sessions)
 
-scheduler = AsyncIOScheduler()
-scheduler.add_job(leaderboard, "cron", hour=hrs, minute=min, timezone=Config.TZ)
-scheduler.start()
+# every timed job runs from the timer service
+timers.every("health", Config.HEALTH_INTERVAL, hellmusic.check_health)
+timers.every("participants", 300, sync_participants)
+timers.every("quality", 15, hellmusic.adapt_quality)
+timers.every("capacity", 10, measure_streams)
+timers.every("cache-gc", 600, hellmusic.gc)
+timers.every("counters", Config.COUNTER_FLUSH, db.flush_counters)
+timers.daily(
+    "leaderboard", leaders.get_hrs(), leaders.get_min(), Config.TZ, leaderboard
+)
@@ -4,24 +4,18 @@ from Music.core.clients import hellbot
 from Music.core.database import db
 
 
-async def get_admins(chat_id: int):
-    admins = []
+async def get_admins(chat_id: int) -> set:
+    admins = set()
     async for x in hellbot.app.get_chat_members(
         chat_id, filter=ChatMembersFilter.ADMINISTRATORS
     ):
-        admins.append(x.user.id)
+        admins.add(x.user.id)
     return admins
 
 
-async def get_auth_users(chat_id: int):
-    auth_users = []
-    async for x in hellbot.app.get_chat_members(
-        chat_id, filter=ChatMembersFilter.ADMINISTRATORS
-    ):
-        auth_users.append(x.user.id)
-    users = await db.get_all_authusers(chat_id)
-    if users:
-        auth_users.extend(users)
+async def get_auth_users(chat_id: int) -> set:
+    auth_users = await get_admins(chat_id)
+    auth_users.update(await db.get_all_authusers(chat_id))
     return auth_users
 
 
@@ -38,10 +32,8 @@ async def get_user_rights(chat_id: int, user_id: int):
 
 
 async def get_user_type(chat_id: int, user_id: int):
-    admins = await get_admins(chat_id)
-    auth_users = await get_auth_users(chat_id)
-    if user_id in admins:
+    if user_id in await get_admins(chat_id):
         return "admin"
-    if user_id in auth_users:
+    if await db.is_authuser(chat_id, user_id):
         return "auth"
     return "user"
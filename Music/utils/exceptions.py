@@ -21,3 +21,8 @@ class JoinVCException(Exception):
 class UserException(Exception):
     def __init__(self, error: str) -> None:
         super().__init__(error)
+
+
+class AssistantException(Exception):
+    def __init__(self, error: str) -> None:
+        super().__init__(error)
@@ -16,6 +16,12 @@ class Leaderboard:
     def __init__(self) -> None:
         # file used to log failed chats during broadcast
         self.file_name = "leaderboard.txt"
+        # top 10 kept up to date from the play counters, reloaded after ttl seconds
+        self.top = None
+        self.loaded_at = 0
+        self.ttl = 300
+        self.texts = {}  # bot username -> rendered leaderboard
+        db.counter_hooks.append(self.played)
 
     def get_hrs(self) -> int:
         try:
@@ -31,6 +37,28 @@ class Leaderboard:
             mins = 0
         return mins
 
+    def _entry(self, user: dict):
+        try:
+            uid = int(user.get("user_id"))
+        except (TypeError, ValueError):
+            # skip malformed records
+            return None
+        # songs_played may be missing -> default 0
+        songs = int(user.get("songs_played", 0) or 0)
+        # username / display name fallback chain
+        user_name = (
+            user.get("user_name")
+            or user.get("first_name")
+            or user.get("name")
+            or "Unknown User"
+        )
+        return {"id": uid, "songs": songs, "user": user_name}
+
+    def _set_top(self, entries: list):
+        entries = sorted(entries, key=lambda x: x["songs"], reverse=True)
+        self.top = entries[:10]
+        self.texts = {}
+
     async def get_top_10(self) -> list:
         """Return a list of at most 10 users sorted by songs_played desc.
 
@@ -38,35 +66,32 @@ class Leaderboard:
         This function is tolerant to older user docs that may be missing
         songs_played or user_name.
         """
-        users_cursor = await db.get_all_users()
-        all_guys = []
-
-        async for user in users_cursor:
-            # user_id
-            try:
-                uid = int(user.get("user_id"))
-            except (TypeError, ValueError):
-                # skip malformed records
-                continue
-
-            # songs_played may be missing -> default 0
-            songs = int(user.get("songs_played", 0) or 0)
-
-            # username / display name fallback chain
-            user_name = (
-                user.get("user_name")
-                or user.get("first_name")
-                or user.get("name")
-                or "Unknown User"
-            )
-
-            all_guys.append({"id": uid, "songs": songs, "user": user_name})
-
-        if not all_guys:
-            return []
-
-        all_guys = sorted(all_guys, key=lambda x: x["songs"], reverse=True)
-        return all_guys[:10]
+        if self.top is None or time.time() - self.loaded_at > self.ttl:
+            # a few extra rows make up for malformed records being skipped
+            users = await db.top_users(15)
+            self._set_top([x for x in map(self._entry, users) if x])
+            self.loaded_at = time.time()
+        return self.top
+
+    async def played(self, counts: dict):
+        """Counter hook: move the cached top 10 by the play counts just written."""
+        if self.top is None:
+            return
+        top = {x["id"]: x for x in self.top}
+        lowest = self.top[-1]["songs"] if len(self.top) >= 10 else -1
+        outside = []
+        for user_id, count in counts.items():
+            if user_id in top:
+                top[user_id]["songs"] += count
+            else:
+                outside.append(user_id)
+        if outside:
+            # only users who just played can have entered the top 10
+            for user in await db.top_users(len(outside), outside):
+                entry = self._entry(user)
+                if entry and entry["songs"] > lowest:
+                    top[entry["id"]] = entry
+        self._set_top(list(top.values()))
 
     async def generate(self, bot_details: dict) -> str:
         """Generate the leaderboard text for /topusers or similar commands.
@@ -76,8 +101,10 @@ class Leaderboard:
           - client: bot client (not used here but kept for compatibility)
           - username: bot username (for deep-links)
         """
-        index = 0
         top_10 = await self.get_top_10()
+        if bot_details["username"] in self.texts:
+            return self.texts[bot_details["username"]]
+        index = 0
         text = f"**🧡 Top 10 Users of {bot_details['mention']}**\n\n"
 
         # If there is no data yet, show a friendly message
@@ -96,6 +123,7 @@ class Leaderboard:
             )
 
         text += "\n**🧡 Enjoy Streaming! Have Fun!**"
+        self.texts[bot_details["username"]] = text
         return text
 
     async def broadcast(self, hellbot, text, buttons):
@@ -37,10 +37,16 @@ class Pages:
         page: int = 0,
         index: int = 0,
         edit: bool = False,
+        loads: list = None,
     ):
         m = message.message if isinstance(message, CallbackQuery) else message
         grouped, total = formatter.group_the_list(collection)
         text = f"__({page+1}/{len(grouped)})__ **{hellbot.app.mention} Active Voice Chats:** __{total} chats__\n\n"
+        if loads:
+            text += "**Assistants Load:**\n"
+            for load in loads:
+                text += f"    **#{load['index']}** {load['name']} ({load['state']}): __{load['streams']} streams ({load['video']} video), {load['errors']} errors{', floodwait' if load['flooded'] else ''} » load {load['load']}__\n"
+            text += "\n"
         btns = Buttons.active_vc_markup(len(grouped), page)
         try:
             for active in grouped[int(page)]:
@@ -49,6 +55,7 @@ class Pages:
                 text += f"    **Listeners:** __{active['participants']}__\n"
                 text += f"    **Playing:** __{active['playing']}__\n"
                 text += f"    **VC Type:** __{active['vc_type']}__\n"
+                text += f"    **Assistant:** __{active['assistant']}__\n"
                 text += f"    **Since:** __{active['active_since']}__\n\n"
         except IndexError:
             page = 0
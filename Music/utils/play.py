@@ -4,10 +4,12 @@ from pyrogram.enums import MessageEntityType
 from pyrogram.types import InlineKeyboardMarkup, Message
 
 from config import Config
+from Music.core.admission import admission
 from Music.core.calls import hellmusic
 from Music.core.clients import hellbot
 from Music.core.database import db
 from Music.core.logger import LOGS
+from Music.core.mailbox import mailbox
 from Music.helpers.buttons import Buttons
 from Music.helpers.strings import TEXTS
 
@@ -50,6 +52,43 @@ class Player:
         return url[offset : offset + length]
 
     async def play(self, message: Message, context: dict, edit: bool = True):
+        chat_id = context["chat_id"]
+        reservation = None
+        downgraded = False
+
+        # a new voice chat session has to fit on this host
+        if not await db.is_active_vc(chat_id) and not Queue.get_queue(chat_id):
+
+            async def waiting():
+                text = "All stream slots are busy, waiting for one to free up ..."
+                if edit:
+                    await message.edit_text(text)
+                else:
+                    await message.reply_text(text)
+
+            admitted = await admission.admit(context["vc_type"], waiting)
+            if admitted is None:
+                text = "I'm streaming at full capacity right now! Please try again in a few minutes."
+                if edit:
+                    await message.edit_text(text)
+                else:
+                    await message.reply_text(text)
+                return
+            # the slot is held through the download until the join is done
+            reservation = admission.reserve(chat_id, admitted)
+            if admitted != context["vc_type"]:
+                context["vc_type"] = admitted
+                downgraded = True
+        try:
+            if downgraded:
+                await message.reply_text(
+                    "Video streams are at capacity right now, playing audio only."
+                )
+            await self._play(message, context, edit)
+        finally:
+            admission.release(reservation)
+
+    async def _play(self, message: Message, context: dict, edit: bool):
         (
             chat_id,
             user_id,
@@ -61,8 +100,7 @@ class Player:
             vc_type,
             force,
         ) = context.values()
-        if force:
-            await hellmusic.leave_vc(chat_id, True)
+
         if video_id == "telegram":
             file_path = file
         else:
@@ -90,35 +128,33 @@ class Player:
                 else:
                     await message.reply_text(str(e))
                 return
-        position = Queue.put_queue(
-            chat_id,
-            user_id,
-            duration,
-            file_path,
-            title,
-            user,
-            video_id,
-            vc_type,
-            force,
-        )
+        try:
+            position = await mailbox.post(
+                chat_id,
+                "play",
+                self._enqueue,
+                chat_id,
+                user_id,
+                duration,
+                file_path,
+                title,
+                user,
+                video_id,
+                vc_type,
+                force,
+                coalesce=False,
+            )
+        except Exception as e:
+            await message.delete()
+            await message.reply_text(str(e))
+            try:
+                if os.path.exists(file_path):
+                    os.remove(file_path)
+            except Exception:
+                pass
+            return
         if position == 0:
             photo = thumb.generate(video_id)
-            try:
-                await hellmusic.join_vc(
-                    chat_id, file_path, True if vc_type == "video" else False
-                )
-            except Exception as e:
-                await message.delete()
-                await message.reply_text(str(e))
-                Queue.clear_queue(chat_id)
-                try:
-                    if os.path.exists(file_path):
-                        os.remove(file_path)
-                    if photo and os.path.exists(photo):
-                        os.remove(photo)
-                except Exception:
-                    pass
-                return
             btns = Buttons.player_markup(chat_id, video_id, hellbot.app.username)
             if photo:
                 sent = await hellbot.app.send_photo(
@@ -174,29 +210,83 @@ class Player:
             Config.QUEUE_CACHE[chat_id] = sent
             return await message.delete()
         await message.delete()
-        await db.update_songs_count(1)
-        await db.update_user(user_id, "songs_played", 1)
+        db.count_play(user_id)
         chat_name = (await hellbot.app.get_chat(chat_id)).title
         await hellbot.logit(
             f"play {vc_type}",
             f"**⤷ Song:** `{title}` \n**⤷ Chat:** {chat_name} [`{chat_id}`] \n**⤷ User:** {user}",
         )
 
+    async def _enqueue(
+        self,
+        chat_id: int,
+        user_id: int,
+        duration: str,
+        file_path: str,
+        title: str,
+        user: str,
+        video_id: str,
+        vc_type: str,
+        force: bool,
+    ) -> int:
+        # runs inside the chat mailbox: force leave, queue and join are one transition
+        if force and chat_id not in hellmusic.lingering:
+            await hellmusic.leave_vc(chat_id, True)
+        position = Queue.put_queue(
+            chat_id,
+            user_id,
+            duration,
+            file_path,
+            title,
+            user,
+            video_id,
+            vc_type,
+            force,
+        )
+        if position == 0:
+            try:
+                await hellmusic.join_vc(
+                    chat_id, file_path, True if vc_type == "video" else False
+                )
+            except Exception:
+                Queue.clear_queue(chat_id)
+                raise
+        return position
+
     async def skip(self, chat_id: int, message: Message):
         await message.edit_text("Skipping ...")
-        await hellmusic.change_vc(chat_id)
+        await mailbox.post(chat_id, "change", hellmusic.change_vc, chat_id)
         await message.delete()
 
+    async def stop(self, chat_id: int):
+        await mailbox.post(
+            chat_id, "leave", hellmusic.leave_vc, chat_id, supersedes=("change",)
+        )
+        await db.set_loop(chat_id, 0)
+
+    async def seek(self, chat_id: int, to_seek: int) -> int:
+        que = Queue.get_current(chat_id)
+        if not que:
+            return None
+        context = {
+            "chat_id": chat_id,
+            "file": await hellmusic.current_media(chat_id),
+            "seek": to_seek,
+            "video": True if que["vc_type"] == "video" else False,
+        }
+        position = await mailbox.post(
+            chat_id, "seek", hellmusic.seek_vc, context, coalesce=False
+        )
+        Queue.set_played(chat_id, position)
+        return position
+
     async def replay(self, chat_id: int, message: Message):
         que = Queue.get_current(chat_id)
         if not que:
             return await message.edit_text("Nothing is playing to replay")
         video = True if que["vc_type"] == "video" else False
         photo = thumb.generate(que["video_id"])
-        if que["file"] == que["video_id"]:
-            file_path = await ytube.download(que["video_id"], True, video)
-        else:
-            file_path = que["file"]
+        file_path = await hellmusic.current_media(chat_id)
 
         # EXTRA SAFETY: if download somehow fails
         if not file_path or (que["file"] == que["video_id"] and not os.path.exists(file_path)):
@@ -261,6 +351,31 @@ class Player:
 
     async def playlist(
         self, message: Message, user_dict: dict, collection: list, video: bool = False
+    ):
+        chat_id = message.chat.id
+        reservation = None
+        # same admission as a single play when the playlist starts a session
+        if not await db.is_active_vc(chat_id) and not Queue.get_queue(chat_id):
+
+            async def waiting():
+                await message.edit_text(
+                    "All stream slots are busy, waiting for one to free up ..."
+                )
+
+            admitted = await admission.admit("video" if video else "voice", waiting)
+            if admitted is None:
+                return await message.edit_text(
+                    "I'm streaming at full capacity right now! Please try again in a few minutes."
+                )
+            reservation = admission.reserve(chat_id, admitted)
+            video = admitted == "video"
+        try:
+            await self._playlist(message, user_dict, collection, video)
+        finally:
+            admission.release(reservation)
+
+    async def _playlist(
+        self, message: Message, user_dict: dict, collection: list, video: bool
     ):
         vc_type = "video" if video else "voice"
         count = failed = 0
@@ -278,23 +393,26 @@ class Player:
                     if not file_path or not os.path.exists(file_path):
                         failed += 1
                         continue
-                    _queue = Queue.put_queue(
-                        message.chat.id,
-                        user_id,
-                        data["duration"],
-                        file_path,
-                        data["title"],
-                        user_mention,
-                        data["id"],
-                        vc_type,
-                        False,
-                    )
+                    photo = thumb.generate(data["id"])
                     try:
-                        photo = thumb.generate(data["id"])
-                        await hellmusic.join_vc(message.chat.id, file_path, video)
+                        # queue and join as one transition of the chat
+                        await mailbox.post(
+                            message.chat.id,
+                            "play",
+                            self._enqueue,
+                            message.chat.id,
+                            user_id,
+                            data["duration"],
+                            file_path,
+                            data["title"],
+                            user_mention,
+                            data["id"],
+                            vc_type,
+                            False,
+                            coalesce=False,
+                        )
                     except Exception as e:
                         await message.edit_text(str(e))
-                        Queue.clear_queue(message.chat.id)
                         try:
                             if os.path.exists(file_path):
                                 os.remove(file_path)
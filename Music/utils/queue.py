@@ -87,5 +87,11 @@ class QueueDB:
         except IndexError:
             pass
 
+    def set_played(self, chat_id: int, seconds: int):
+        try:
+            self.queue[chat_id][0]["played"] = seconds
+        except (KeyError, IndexError):
+            pass
+
 
 Queue = QueueDB()
@@ -0,0 +1,76 @@
+import asyncio
+import bisect
+import os
+
+from Music.core.logger import LOGS
+
+
+class SeekIndex:
+    """
+    Keyframe index of the media files being streamed.
+    - built once per file in background with ffprobe (keyframes only, no decoding)
+    - video seeks land on the nearest keyframe so the stream starts clean
+      and the played time stays exact
+    """
+
+    def __init__(self, limit: int = 100):
+        self.index = {}  # (path, mtime) -> sorted keyframe timestamps
+        self.building = set()
+        self.limit = limit
+
+    def _key(self, path: str):
+        try:
+            return (path, os.path.getmtime(path))
+        except OSError:
+            return None
+
+    async def build(self, path: str):
+        key = self._key(path)
+        if key is None or key in self.index or key in self.building:
+            return
+        self.building.add(key)
+        try:
+            proc = await asyncio.create_subprocess_exec(
+                "ffprobe",
+                "-v",
+                "error",
+                "-select_streams",
+                "v:0",
+                "-skip_frame",
+                "nokey",
+                "-show_entries",
+                "frame=pts_time",
+                "-of",
+                "csv=p=0",
+                path,
+                stdout=asyncio.subprocess.PIPE,
+                stderr=asyncio.subprocess.DEVNULL,
+            )
+            out, _ = await proc.communicate()
+            times = []
+            for line in out.decode().splitlines():
+                try:
+                    times.append(float(line.strip().strip(",")))
+                except ValueError:
+                    continue
+            self.index[key] = sorted(times)
+        except Exception as e:
+            LOGS.warning(f">> Failed to index keyframes of {path}: {e}")
+            self.index[key] = []
+        finally:
+            self.building.discard(key)
+
+        while len(self.index) > self.limit:
+            self.index.pop(next(iter(self.index)))
+
+    def position(self, path: str, seconds: int) -> int:
+        """Nearest keyframe to the given position, or the position itself if not indexed."""
+        times = self.index.get(self._key(path))
+        if not times:
+            return seconds
+        i = bisect.bisect_left(times, seconds)
+        near = [times[x] for x in (i - 1, i) if 0 <= x < len(times)]
+        return int(round(min(near, key=lambda t: abs(t - seconds))))
+
+
+seeker = SeekIndex()
@@ -0,0 +1,146 @@
+import asyncio
+import os
+
+from config import Config
+from Music.core.logger import LOGS
+
+
+class Transcoder:
+    """
+    Optional stream-ready cache of audio tracks.
+    - after a track first streams it is decoded once in background into a
+      48kHz stereo pcm wav next to the download
+    - later plays (loops, replays, seeks, requests) read the wav, so ffmpeg
+      only has to copy samples instead of demuxing and decoding the container;
+      the wav header keeps the file probeable like any other input
+    - copies are dropped with their download and the least recently played
+      ones go first once they outgrow PRETRANSCODE_CACHE
+    - with SHARE_DECODE on, a track live in several chats gets a wav copy even
+      with the cache off, chats starting it after the copy is finished reuse
+      it; this is cache reuse, every chat still runs its own ffmpeg reader
+    """
+
+    FORMAT = "-f wav -acodec pcm_s16le -ar 48000 -ac 2"
+
+    def __init__(self):
+        self.running = {}  # source path -> partial output being written
+        self.reused = 0
+
+    @property
+    def enabled(self) -> bool:
+        return Config.PRETRANSCODE.lower() == "on"
+
+    @property
+    def sharing(self) -> bool:
+        return Config.SHARE_DECODE.lower() == "on"
+
+    def _target(self, path: str) -> str:
+        name = os.path.splitext(os.path.basename(path))[0]
+        return os.path.join(Config.DWL_DIR, f"{name}.pcm.wav")
+
+    def cached(self, path: str) -> str:
+        """Stream-ready file of the given media, None if there is none yet."""
+        if not self.enabled:
+            return None
+        target = self._complete(path)
+        if target:
+            # last play time, eviction removes the oldest first
+            os.utime(target)
+        return target
+
+    def _complete(self, path: str) -> str:
+        target = self._target(path)
+        try:
+            if os.path.getmtime(target) >= os.path.getmtime(path):
+                return target
+        except OSError:
+            pass
+        return None
+
+    def reuse(self, path: str) -> str:
+        """
+        Finished copy for a chat starting a track that already streams elsewhere.
+        None until the copy is done, it is started for the chats that come later.
+        """
+        if not self.sharing:
+            return None
+        done = self._complete(path)
+        if done:
+            self.reused += 1
+            os.utime(done)
+            return done
+        if path not in self.running:
+            asyncio.create_task(self.prepare(path, True))
+        return None
+
+    async def prepare(self, path: str, force: bool = False):
+        if not (self.enabled or force) or path in self.running or self._complete(path):
+            return
+        if not os.path.exists(path):
+            return
+        target = self._target(path)
+        temp = f"{target}.part"
+        self.running[path] = temp
+        try:
+            proc = await asyncio.create_subprocess_exec(
+                "ffmpeg",
+                "-y",
+                "-v",
+                "error",
+                "-i",
+                path,
+                "-vn",
+                *self.FORMAT.split(),
+                temp,
+                stdout=asyncio.subprocess.DEVNULL,
+                stderr=asyncio.subprocess.DEVNULL,
+            )
+            if await proc.wait() == 0:
+                os.replace(temp, target)
+            else:
+                LOGS.warning(f">> Failed to pre-transcode {path}")
+        except Exception as e:
+            LOGS.warning(f">> Failed to pre-transcode {path}: {e}")
+        finally:
+            self.running.pop(path, None)
+            if os.path.exists(temp):
+                os.remove(temp)
+
+    def remove(self, path: str):
+        try:
+            os.remove(self._target(path))
+        except OSError:
+            pass
+
+    def evict(self, keep: list = ()):
+        """Trim the cache to PRETRANSCODE_CACHE MB, copies of the given sources stay."""
+        keep = {self._target(x) for x in keep} | set(self.running.values())
+        files = []
+        for name in os.listdir(Config.DWL_DIR):
+            file = os.path.join(Config.DWL_DIR, name)
+            if file in keep:
+                continue
+            try:
+                if name.endswith(".pcm.wav.part"):
+                    # left behind by a crash, nothing is writing it anymore
+                    os.remove(file)
+                elif name.endswith(".pcm.wav"):
+                    stat = os.stat(file)
+                    files.append((stat.st_mtime, stat.st_size, file))
+            except OSError:
+                continue
+        if not Config.PRETRANSCODE_CACHE:
+            return
+        size = sum(x[1] for x in files)
+        limit = Config.PRETRANSCODE_CACHE * 1024 * 1024
+        for _, length, file in sorted(files):
+            if size <= limit:
+                break
+            try:
+                os.remove(file)
+                size -= length
+            except OSError:
+                continue
+
+
+transcoder = Transcoder()
@@ -10,7 +10,7 @@ class Config(object):
     API_HASH = getenv("API_HASH", None)                # get from my.telegram.org
     API_ID = int(getenv("API_ID", 0))                  # get from my.telegram.org
     BOT_TOKEN = getenv("BOT_TOKEN", None)              # get from @BotFather
-    DATABASE_URL = getenv("DATABASE_URL", None)        # from https://cloud.mongodb.com/
+    DATABASE_URL = getenv("DATABASE_URL", None)        # from https://cloud.mongodb.com/ or sqlite:///file.db for a local database
     LOGGER_ID = int(getenv("LOGGER_ID", ""))            # make a channel and get its ID
     OWNER_ID = getenv("OWNER_ID", "6848223695")                  # enter your id here
     API_URL = getenv("API_URL", 'https://api.thequickearn.xyz') #youtube song url
@@ -19,25 +19,53 @@ class Config(object):
 
     
     # optional config variables
+    ADMISSION_CPU = int(getenv("ADMISSION_CPU", 90))    # refuse new streams that would push cpu % above this. 0 to disable
+    ADMISSION_RAM = int(getenv("ADMISSION_RAM", 90))    # refuse new streams that would push ram % above this. 0 to disable
+    ADMISSION_WAIT = int(getenv("ADMISSION_WAIT", 30))  # seconds a new stream waits for a free slot before refusing
+    ASSISTANT_ERROR_WEIGHT = int(getenv("ASSISTANT_ERROR_WEIGHT", 5))   # load added per recent assistant error
+    ASSISTANT_ERROR_WINDOW = int(getenv("ASSISTANT_ERROR_WINDOW", 600)) # seconds an error counts towards load
+    ASSISTANT_SPAWN_LOAD = int(getenv("ASSISTANT_SPAWN_LOAD", 10))     # start an idle assistant when all online ones reach this load
+    ASSISTANT_VIDEO_WEIGHT = int(getenv("ASSISTANT_VIDEO_WEIGHT", 3))   # load of one video stream (voice = 1)
+    ASSISTANTS_ON_BOOT = int(getenv("ASSISTANTS_ON_BOOT", 0))           # assistants started at boot, rest start on demand. 0 for all
     BLACK_IMG = getenv("BLACK_IMG", "https://files.catbox.moe/jwc4b6.jpg")        # black image for progress
     BOT_NAME = getenv("BOT_NAME", "Arc Music")   # dont put fancy texts here.
     BOT_PIC = getenv("BOT_PIC", "https://files.catbox.moe/b64xz8.jpg")           # put direct link to image here
+    COUNTER_FLUSH = int(getenv("COUNTER_FLUSH", 30))    # seconds between writes of song play counters to database
+    CPU_HIGH = int(getenv("CPU_HIGH", 85))      # cpu % above which video streams are stepped down. 0 to disable
+    CPU_LOW = int(getenv("CPU_LOW", 60))        # cpu % below which video quality is stepped back up
+    DB_WATCH = getenv("DB_WATCH", "off")        # "on" to drop cached settings on changes from other processes (needs a replica set)
+    HEALTH_FAILURES = int(getenv("HEALTH_FAILURES", 3))    # failed health checks before an assistant's chats are moved
+    HEALTH_INTERVAL = int(getenv("HEALTH_INTERVAL", 60))   # seconds between assistant health checks
     LEADERBOARD_TIME = getenv("LEADERBOARD_TIME", "8:00")   # time in 24hr format for leaderboard broadcast
+    LINGER_TIME = int(getenv("LINGER_TIME", 30))     # seconds the assistant stays in VC after the queue ends. 0 to leave at once
     LYRICS_API = getenv("LYRICS_API", "gIgMyTXuwJoY9VCPNwKdb_RUOA_9mCMmRlbrrdODmNvcpslww_2RIbbWOB8YdBW9")             # from https://docs.genius.com/
+    MAX_BANDWIDTH = int(getenv("MAX_BANDWIDTH", 0))     # upload limit in Mbit/s for all streams. 0 for no limit
     MAX_FAVORITES = int(getenv("MAX_FAVORITES", 30))    # max number of favorite tracks
+    MAX_STREAMS = int(getenv("MAX_STREAMS", 0))         # max concurrent voice chats. 0 for no limit
+    MAX_VIDEO_STREAMS = int(getenv("MAX_VIDEO_STREAMS", 0))     # max concurrent video chats, more play audio only. 0 for no limit
+    MEMBER_CACHE_TIME = int(getenv("MEMBER_CACHE_TIME", 3600))  # seconds an assistant's chat membership is trusted without checking
+    MIGRATE_LIMIT = int(getenv("MIGRATE_LIMIT", 5))    # chats moved at the same time when an assistant fails
+    NAME_REFRESH = int(getenv("NAME_REFRESH", 3600))    # min seconds between user name updates in database
     PLAY_LIMIT = int(getenv("PLAY_LIMIT", 0))           # time in minutes. 0 for no limit
+    PRELOAD_TIME = int(getenv("PRELOAD_TIME", 30))   # seconds before a track ends to fetch the next one. 0 to disable
+    PRETRANSCODE = getenv("PRETRANSCODE", "off")        # "on" to keep a stream-ready wav copy of played audio tracks
+    PRETRANSCODE_CACHE = int(getenv("PRETRANSCODE_CACHE", 1024))   # MB of wav copies kept, least recently played removed first. 0 for no limit
     PRIVATE_MODE = getenv("PRIVATE_MODE", "off")        # "on" or "off" to enable/disable private mode
+    SHARE_DECODE = getenv("SHARE_DECODE", "off")        # "on" to keep a wav copy of tracks live in several chats, for the chats starting them later
+    SLOW_QUERY = int(getenv("SLOW_QUERY", 500))         # log database queries slower than this, in ms. 0 to disable
     SONG_LIMIT = int(getenv("SONG_LIMIT", 0))           # time in minutes. 0 for no limit
+    STREAM_QUALITY = getenv("STREAM_QUALITY", "medium")     # default stream quality: "high", "medium" or "low"
     TELEGRAM_IMG = getenv("TELEGRAM_IMG", "https://files.catbox.moe/20hvch.jpg")         # put direct link to image here
     TG_AUDIO_SIZE_LIMIT = int(getenv("TG_AUDIO_SIZE_LIMIT", 104857600))     # size in bytes. 0 for no limit
     TG_VIDEO_SIZE_LIMIT = int(getenv("TG_VIDEO_SIZE_LIMIT", 1073741824))    # size in bytes. 0 for no limit
     TZ = getenv("TZ", "Asia/Kolkata")   # https://en.wikipedia.org/wiki/List_of_tz_database_time_zones
 
-    # String Sessions
+    # String Sessions (HELLBOT_SESSION2, HELLBOT_SESSION3, ... are picked up without limit)
     HELLBOT_SESSION = getenv("HELLBOT_SESSION", None)
     HELLBOT_SESSION2 = getenv("HELLBOT_SESSION2", None)
     HELLBOT_SESSION3 = getenv("HELLBOT_SESSION3", None)
     HELLBOT_SESSION4 = getenv("HELLBOT_SESSION4", None)
+    SESSIONS_DIR = getenv("SESSIONS_DIR", "./sessions/")   # *.session files or *.txt string sessions
     
     # do not edit these variables
     BANNED_USERS = filters.user()
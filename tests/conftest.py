@@ -0,0 +1,11 @@
+import os
+import sys
+
+# config.py reads these at import time, and Music/__init__.py stops without them
+os.environ.setdefault("API_ID", "1")
+os.environ.setdefault("API_HASH", "test")
+os.environ.setdefault("BOT_TOKEN", "test")
+os.environ.setdefault("DATABASE_URL", "sqlite:///:memory:")
+os.environ.setdefault("LOGGER_ID", "-100")
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -0,0 +1,52 @@
+import asyncio
+import os
+
+import pytest
+
+pytest.importorskip("dotenv")
+pytest.importorskip("pyrogram")
+
+
+def _favorites_case(store):
+    async def run():
+        await store.add_favorites(1, "abc", {"title": "first"})
+        await store.add_favorites(1, "def", {"title": "second"})
+        assert await store.get_favorites(1, []) == {}
+        assert await store.get_favorites(1, ["abc"]) == {"abc": {"title": "first"}}
+        assert await store.get_favorites(1, ["abc", "xyz"]) == {"abc": {"title": "first"}}
+        assert await store.get_favorites(2, ["abc"]) == {}
+
+    return run()
+
+
+def test_sqlite_get_favorites(tmp_path):
+    from Music.core.sqlite import SQLiteDatabase
+
+    async def run():
+        store = SQLiteDatabase(f"sqlite:///{tmp_path / 'test.db'}")
+        await store.connect()
+        await _favorites_case(store)
+
+    asyncio.run(run())
+
+
+@pytest.mark.skipif(
+    not os.environ.get("TEST_MONGO_URL"), reason="TEST_MONGO_URL is not set"
+)
+def test_mongo_get_favorites(monkeypatch):
+    pytest.importorskip("motor")
+    from config import Config
+    from Music.core.database import Database
+
+    monkeypatch.setattr(Config, "DATABASE_URL", os.environ["TEST_MONGO_URL"])
+
+    async def run():
+        store = Database()
+        # keep the test away from the bot's own collections
+        store.favorites = store.client["HellMusicTest"].favorites
+        try:
+            await _favorites_case(store)
+        finally:
+            await store.client.drop_database("HellMusicTest")
+
+    asyncio.run(run())